@@ -1,4 +1,5 @@
 import collections
+from concurrent.futures import ProcessPoolExecutor
 import networkx as nx
 import operator
 import community as community_louvain
@@ -162,15 +163,24 @@ We want to assign each isolated node to their own community
 @return altered partition in which isolated nodes each are their own community
 """
 def assignIsolatedNodesTheirOwnCommunity(graph, partition):
+    #get node IDs that are isolated
+    isolateNodeIDs = getIsolatedNodes(graph)
+    return assignNodesTheirOwnCommunity(isolateNodeIDs, partition)
+
+
+"""
+@param nodeIDs : list of node IDs that should not share their community with other nodes
+@param partition : partition of the current snapshot as a dictionary with the nodes as keys and their communities as value
+@return altered partition in which these nodes each are their own community
+"""
+def assignNodesTheirOwnCommunity(nodeIDs, partition):
     #if node is isolated AND has other members in its community: change this node to its own community
 
     # distinct community numbers
     communities = set(val for val in partition.values())
     maxCommNumber = max(communities)
 
-    #get node IDs that are isolated
-    isolateNodeIDs = getIsolatedNodes(graph)
-    for node in isolateNodeIDs:
+    for node in nodeIDs:
         #check if there are other nodes it their community
         if getNumberOfNodesInCommunity(partition, partition[node]) > 1:
             maxCommNumber = maxCommNumber + 1
@@ -196,4 +206,471 @@ def getNumberOfNodesInCommunity(partition, communityNumber):
 """
 def getIsolatedNodes(graph):
     isolates =  list(nx.isolates(graph))
-    return isolates
\ No newline at end of file
+    return isolates
+
+
+
+
+"""
+Community detection that is kept from one snapshot to the next, see createCommunityEngine
+Each snapshot is converted to a networkx graph and passed to communityDetection with the communities of the previous snapshot
+"""
+class NetworkxCommunityEngine:
+
+    def __init__(self):
+        self.previousCommunities = None
+
+    #the communities of every snapshot are detected
+    def getNumberOfSkippedSnapshots(self):
+        return 0
+
+    #nothing to release
+    def close(self):
+        pass
+
+    """
+    @param snapshot Graph object of the next snapshot
+    @returns partition of the snapshot as a dictionary with the node IDs as keys and their communities as value
+    """
+    def detectCommunities(self, snapshot):
+        netwxGraph = snapshot.createNetworkxGraph()
+        # new nodes do not belong to a community yet and need to be added as a separate community
+        previousCommunities = processPreviousCommunityState(netwxGraph.nodes(), self.previousCommunities)
+        communities = communityDetection(netwxGraph, previousCommunities)
+        self.previousCommunities = communities.copy()
+        return communities
+
+
+"""
+Leiden community detection on an igraph graph that is kept from one snapshot to the next
+Only the nodes and edges that appear or disappear between two snapshots are added to or removed from the igraph graph, and the edge weights are replaced
+Vertices are never removed, so the vertex indices stay the same and the membership vector of the previous snapshot is passed to Leiden as it is
+The snapshots must be the successive snapshots of a single temporal graph: nodes are only added, after the nodes of the previous snapshot
+
+With a tolerance, the communities are only detected again where the graph changed:
+if no nodes or edges appeared or disappeared and no edge weight changed by more than the tolerance since the communities were last detected, the previous communities are kept
+otherwise only the connected components with a change are optimized again
+"""
+class LeidenCommunityEngine:
+
+    """
+    @param tolerance: largest change of an edge weight for which the communities are not detected again, or None to detect the communities of every snapshot
+    """
+    def __init__(self, tolerance = None):
+        self.tolerance = tolerance
+        self.numberOfSkippedSnapshots = 0
+        self.reset()
+
+    #Start from an empty igraph graph
+    def reset(self):
+        #the Edge object of each igraph edge is kept in its "edge" attribute
+        self.graph = ig.Graph()
+        #node ID of each vertex, in the order of the vertex indices
+        self.vertexIDs = []
+        #dict with node ID as key and vertex index as value
+        self.vertexIndex = {}
+        #number of edges of each vertex, and the set of vertices without edges
+        self.degrees = []
+        self.isolatedVertices = set()
+        #community of each vertex in the previous snapshot
+        self.membership = []
+        #dict with the Edge object as key and the weight of the edge when its communities were last detected as value
+        self.referenceWeights = {}
+        #snapshot that the igraph graph represents
+        self.previousSnapshot = None
+
+    def getNumberOfSkippedSnapshots(self):
+        return self.numberOfSkippedSnapshots
+
+    #nothing to release
+    def close(self):
+        pass
+
+    """
+    The igraph graph is updated with the changes of the snapshot with respect to the previous snapshot, see Graph.getChangesSince
+    @param snapshot Graph object of the next snapshot
+    @returns partition of the snapshot as a dictionary with the node IDs as keys and their communities as value
+    """
+    def detectCommunities(self, snapshot):
+        changes = snapshot.getChangesSince(self.previousSnapshot)
+        if changes is None:
+            #not a successor of the previous snapshot: start over with all its nodes and edges
+            self.reset()
+            changes = (snapshot.nodes, [], snapshot.edges)
+        addedNodes, removedEdges, addedEdges = changes
+        self.previousSnapshot = snapshot
+
+        #new nodes each get their own community, after the highest community number so far
+        maxCommNumber = max(self.membership, default = -1)
+        for node in addedNodes:
+            self.vertexIndex[node.getID()] = len(self.vertexIDs)
+            self.isolatedVertices.add(len(self.vertexIDs))
+            self.vertexIDs.append(node.getID())
+            self.degrees.append(0)
+            maxCommNumber = maxCommNumber + 1
+            self.membership.append(maxCommNumber)
+        self.graph.add_vertices(len(addedNodes))
+
+        removedEdges, addedEdges = self.__updateEdges(removedEdges, addedEdges)
+        edges = self.graph.es["edge"] if self.graph.ecount() else []
+        edgeWeights = snapshot.edgeWeights
+        weights = list(map(edgeWeights.__getitem__, edges))
+
+        if self.tolerance is None:
+            membership = self.__optimize(self.graph, self.membership, weights)
+        else:
+            #vertices that are touched by a change
+            changedVertices = {self.vertexIndex[node.getID()] for node in addedNodes}
+            for edge in removedEdges + addedEdges:
+                changedVertices.update(self.__vertexPair(edge))
+            for edge, weight in zip(edges, weights):
+                if edge in self.referenceWeights and abs(weight - self.referenceWeights[edge]) > self.tolerance:
+                    changedVertices.update(self.__vertexPair(edge))
+
+            if not changedVertices:
+                #nothing changed enough: keep the previous communities
+                self.numberOfSkippedSnapshots += 1
+                return dict(zip(self.vertexIDs, self.membership))
+            membership = self.__optimizeChangedComponents(changedVertices, weights)
+
+            #the reference weights of the optimized edges are the current weights
+            for edge, weight in zip(edges, weights):
+                if edge not in self.referenceWeights or self.__vertexPair(edge)[0] in self.optimizedVertices:
+                    self.referenceWeights[edge] = weight
+            for edge in removedEdges:
+                self.referenceWeights.pop(edge, None)
+
+        # isolated nodes should be their own community
+        self.membership = self.__separateIsolatedVertices(membership)
+        return dict(zip(self.vertexIDs, self.membership))
+
+    """
+    Same as assignNodesTheirOwnCommunity, with the community sizes counted once instead of for every isolated node
+    @param membership community of each vertex
+    @return membership with every isolated vertex that shares its community in a new community
+    """
+    def __separateIsolatedVertices(self, membership):
+        membership = list(membership)
+        communitySizes = collections.Counter(membership)
+        maxCommNumber = max(membership, default = -1)
+        for v in sorted(self.isolatedVertices):
+            if communitySizes[membership[v]] > 1:
+                communitySizes[membership[v]] -= 1
+                maxCommNumber = maxCommNumber + 1
+                membership[v] = maxCommNumber
+                communitySizes[maxCommNumber] = 1
+        return membership
+
+    """
+    Optimize the communities of the connected components that contain a changed vertex, the other vertices keep their community
+    The components are optimized together as a subgraph, with the resolution scaled to the total weight of the subgraph: 
+    this gives the same modularity contribution as optimizing the whole graph, as communities never span multiple components
+    @param changedVertices set of vertex indices that are touched by a change
+    @param weights list of the edge weights in the order of the igraph edge IDs
+    @return membership vector of all vertices
+    """
+    def __optimizeChangedComponents(self, changedVertices, weights):
+        components = self.graph.connected_components()
+        optimizedComponents = {components.membership[v] for v in changedVertices}
+        self.optimizedVertices = {v for v, component in enumerate(components.membership) if component in optimizedComponents}
+        if len(self.optimizedVertices) == self.graph.vcount():
+            return self.__optimize(self.graph, self.membership, weights)
+
+        vertices = sorted(self.optimizedVertices)
+        self.graph.es["weight"] = weights
+        subgraph = self.graph.induced_subgraph(vertices)
+        subgraphWeights = subgraph.es["weight"] if subgraph.ecount() else []
+        totalWeight = sum(weights)
+        resolution = sum(subgraphWeights) / totalWeight if totalWeight else 1
+
+        #the communities of the subgraph are numbered from 0 to start from
+        communityNumbers = {}
+        initialMembership = [communityNumbers.setdefault(self.membership[v], len(communityNumbers)) for v in vertices]
+        subgraphMembership = self.__optimize(subgraph, initialMembership, subgraphWeights, resolution)
+        #communities of the subgraph get numbers after the communities of the other vertices, so they are unique
+        firstCommNumber = max(self.membership) + 1
+        membership = list(self.membership)
+        for v, community in zip(vertices, subgraphMembership):
+            membership[v] = firstCommNumber + community
+        return membership
+
+    """
+    @param graph igraph graph
+    @param initialMembership community of each vertex to start from
+    @param weights list of the edge weights in the order of the igraph edge IDs
+    @param resolution None to optimize the modularity, otherwise the resolution of the modularity of a subgraph (see __optimizeChangedComponents)
+    @return membership vector found by Leiden
+    """
+    def __optimize(self, graph, initialMembership, weights, resolution = None):
+        if graph.ecount() == 0:
+            # the weights attribute does not work for a graph without edges
+            weights = None
+        if resolution is None:
+            partition = la.find_partition(graph, la.ModularityVertexPartition, initial_membership=initialMembership, weights=weights, n_iterations = -1, seed=123)
+        else:
+            partition = la.find_partition(graph, la.RBConfigurationVertexPartition, initial_membership=initialMembership, weights=weights, resolution_parameter=resolution, n_iterations = -1, seed=123)
+        return partition.membership
+
+    """
+    Remove the edges that disappeared and add the new edges
+    @param removedEdges list of Edge objects that are removed from the graph
+    @param addedEdges list of Edge objects that are added to the graph
+    @return tuple (list of the removed Edge objects, list of the added Edge objects) without the edges that replace a removed edge between the same nodes
+    """
+    def __updateEdges(self, removedEdges, addedEdges):
+        addedEdgesByPair = {self.__vertexPair(edge): edge for edge in addedEdges}
+
+        deletedEdges = []
+        for edge in removedEdges:
+            pair = self.__vertexPair(edge)
+            newEdge = addedEdgesByPair.pop(pair, None)
+            if newEdge is None:
+                deletedEdges.append(edge)
+            else:
+                #the edge is removed and created again in the same snapshot: it keeps its place and its reference weight
+                self.graph.es[self.graph.get_eid(*pair)]["edge"] = newEdge
+                if edge in self.referenceWeights:
+                    self.referenceWeights[newEdge] = self.referenceWeights.pop(edge)
+
+        if deletedEdges:
+            #removing edges keeps the order of the other edges
+            deletedPairs = [self.__vertexPair(edge) for edge in deletedEdges]
+            self.graph.delete_edges(deletedPairs)
+            for pair in deletedPairs:
+                self.__changeDegrees(pair, -1)
+
+        #add the new edges in a fixed order, so the result does not depend on the order in which they were created
+        addedPairs = sorted(addedEdgesByPair)
+        if addedPairs:
+            self.graph.add_edges(addedPairs, attributes = {"edge": [addedEdgesByPair[pair] for pair in addedPairs]})
+            for pair in addedPairs:
+                self.__changeDegrees(pair, 1)
+
+        return deletedEdges, [addedEdgesByPair[pair] for pair in addedPairs]
+
+    #Add change to the degree of both vertices of the pair and keep track of the vertices without edges
+    def __changeDegrees(self, pair, change):
+        for v in pair:
+            self.degrees[v] += change
+            if self.degrees[v] == 0:
+                self.isolatedVertices.add(v)
+            else:
+                self.isolatedVertices.discard(v)
+
+    #@return tuple of the two vertex indices of the nodes of the Edge object, lowest index first
+    def __vertexPair(self, edge):
+        vertices = sorted(self.vertexIndex[nodeID] for nodeID in edge.getTupleFormatIDonly())
+        return (vertices[0], vertices[-1])
+
+"""
+Leiden community detection of one connected component, run in a worker process for large components
+The modularity of a graph is the sum of the contributions of its connected components, as a community never spans two components:
+a component is optimized with the RB configuration model and the resolution set to its share of the total edge weight, which gives the contribution of the component to the modularity of the whole graph
+@param numberOfVertices number of nodes of the component
+@param edgeList list of tuples of the vertex indices (0 .. numberOfVertices - 1) of the two nodes of each edge
+@param weights list of the weights of the edges, in the order of edgeList
+@param initialMembership list with the community of each vertex to start from
+@param resolution weight of the component divided by the total edge weight of the graph
+@return membership vector found by Leiden
+"""
+def detectComponentCommunities(numberOfVertices, edgeList, weights, initialMembership, resolution):
+    graph = ig.Graph(n = numberOfVertices, edges = edgeList)
+    partition = la.find_partition(graph, la.RBConfigurationVertexPartition, initial_membership=initialMembership, weights=weights, resolution_parameter=resolution, n_iterations = -1, seed=123)
+    return partition.membership
+
+
+"""
+Leiden community detection per connected component of each snapshot
+The components with at least minimumParallelSize nodes are optimized in parallel in a pool of processes, the others in this process
+Each component starts from the communities of the previous snapshot restricted to that component, new nodes start in their own community
+The communities of all components are numbered one after the other, so the community IDs are unique in the snapshot
+"""
+class ComponentCommunityEngine:
+
+    """
+    @param numberOfProcesses: number of worker processes, None for the number of processors
+    @param minimumParallelSize: number of nodes from which a component is sent to a worker process
+    """
+    def __init__(self, numberOfProcesses = None, minimumParallelSize = 100):
+        self.numberOfProcesses = numberOfProcesses
+        self.minimumParallelSize = minimumParallelSize
+        #the pool of processes is started when the first large component is found
+        self.executor = None
+        self.previousCommunities = {}
+
+    #the communities of every snapshot are detected
+    def getNumberOfSkippedSnapshots(self):
+        return 0
+
+    #Stop the worker processes
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    """
+    @param snapshot Graph object of the next snapshot
+    @returns partition of the snapshot as a dictionary with the node IDs as keys and their communities as value
+    """
+    def detectCommunities(self, snapshot):
+        totalWeight = sum(snapshot.edgeWeights.values())
+        #list of tuples (node IDs of the component, membership vector or the Future of the worker process)
+        results = []
+        for nodeIDs in self.__findComponents(snapshot):
+            if len(nodeIDs) == 1:
+                results.append((nodeIDs, [0]))
+                continue
+            arguments = self.__componentArguments(snapshot, nodeIDs, totalWeight)
+            if len(nodeIDs) >= self.minimumParallelSize:
+                results.append((nodeIDs, self.__getExecutor().submit(detectComponentCommunities, *arguments)))
+            else:
+                results.append((nodeIDs, detectComponentCommunities(*arguments)))
+
+        partition = {}
+        firstCommNumber = 0
+        for nodeIDs, membership in results:
+            if not isinstance(membership, list):
+                membership = membership.result()
+            for nodeID, community in zip(nodeIDs, membership):
+                partition[nodeID] = firstCommNumber + community
+            firstCommNumber += max(membership) + 1
+
+        self.previousCommunities = partition
+        return dict(partition)
+
+    """
+    @param snapshot Graph object
+    @return list of the connected components as lists of node IDs, in the order of the nodes of the snapshot
+    """
+    def __findComponents(self, snapshot):
+        neighborMap = snapshot.neighborMap
+        components = []
+        visited = set()
+        for node in snapshot.nodes:
+            nodeID = node.getID()
+            if nodeID in visited:
+                continue
+            visited.add(nodeID)
+            component = [nodeID]
+            #breadth first search: the component grows while it is visited
+            for memberID in component:
+                for neighborID in neighborMap.get(memberID, {}):
+                    if neighborID not in visited:
+                        visited.add(neighborID)
+                        component.append(neighborID)
+            components.append(component)
+        return components
+
+    """
+    @param snapshot Graph object
+    @param nodeIDs list of node IDs of a connected component
+    @param totalWeight sum of the edge weights of the snapshot
+    @return tuple of the arguments of detectComponentCommunities for this component
+    """
+    def __componentArguments(self, snapshot, nodeIDs, totalWeight):
+        vertexIndex = {nodeID: i for i, nodeID in enumerate(nodeIDs)}
+        neighborMap = snapshot.neighborMap
+        edgeWeights = snapshot.edgeWeights
+        edgeList = []
+        weights = []
+        for i, nodeID in enumerate(nodeIDs):
+            for neighborID, edge in neighborMap[nodeID].items():
+                #each edge once, from its node with the lowest index
+                if vertexIndex[neighborID] >= i:
+                    edgeList.append((i, vertexIndex[neighborID]))
+                    weights.append(edgeWeights[edge])
+
+        #the communities of the previous snapshot, numbered from 0 within the component; new nodes get their own community
+        communityNumbers = {}
+        initialMembership = []
+        for nodeID in nodeIDs:
+            key = self.previousCommunities.get(nodeID, ("new", nodeID))
+            initialMembership.append(communityNumbers.setdefault(key, len(communityNumbers)))
+
+        return len(nodeIDs), edgeList, weights, initialMembership, sum(weights) / totalWeight
+
+    def __getExecutor(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers = self.numberOfProcesses)
+        return self.executor
+
+
+"""
+Leiden community detection over a window of consecutive snapshots at once (multi-slice modularity)
+Each snapshot is a slice, and each node is linked to itself in the next slice, so the communities are found jointly for the whole window
+@param slices list with for each snapshot a tuple (list of node IDs, list of tuples (source ID, target ID, weight) of the edges), ordered in time
+@param interSliceWeight weight of the link between a node and itself in the next snapshot: the higher, the more stable the communities over time
+@return list with for each snapshot the membership vector in the order of its node IDs, the community IDs are the same over the snapshots of the window
+"""
+def detectWindowCommunities(slices, interSliceWeight):
+    graphs = []
+    for nodeIDs, edgeList in slices:
+        vertexIndex = {nodeID: i for i, nodeID in enumerate(nodeIDs)}
+        graph = ig.Graph(n = len(nodeIDs), edges = [(vertexIndex[source], vertexIndex[target]) for source, target, weight in edgeList])
+        graph.vs["id"] = nodeIDs
+        graph.es["weight"] = [weight for source, target, weight in edgeList]
+        graphs.append(graph)
+
+    memberships, improvement = la.find_partition_temporal(graphs, la.ModularityVertexPartition, interslice_weight=interSliceWeight, n_iterations = -1, seed=123)
+    return memberships
+
+
+"""
+Detect the communities of all snapshots in windows of consecutive snapshots, see detectWindowCommunities
+The windows are independent, so they are analyzed in parallel in a pool of processes if a number of processes above 1 is given and there is more than one window
+@param snapshots list of Graph objects ordered in time
+@param windowSize number of snapshots per window
+@param numberOfProcesses number of worker processes, None to analyze the windows in this process
+@param interSliceWeight see detectWindowCommunities
+@return list with for each snapshot its partition as a dictionary with the node IDs as keys and their communities as value
+        the community IDs are unique over the windows
+"""
+def detectTemporalCommunities(snapshots, windowSize, numberOfProcesses = None, interSliceWeight = 1):
+    #only the node IDs and the edges are sent to the worker processes
+    slices = [(snapshot.getListOfNodeIDs(), snapshot.getListOfEdges()) for snapshot in snapshots]
+    windows = [slices[i:i + windowSize] for i in range(0, len(slices), windowSize)]
+
+    if numberOfProcesses is None or numberOfProcesses <= 1 or len(windows) <= 1:
+        #nothing to run in parallel: no pool is started
+        windowMemberships = [detectWindowCommunities(window, interSliceWeight) for window in windows]
+    else:
+        with ProcessPoolExecutor(max_workers = numberOfProcesses) as executor:
+            windowMemberships = list(executor.map(detectWindowCommunities, windows, [interSliceWeight] * len(windows)))
+
+    partitions = []
+    firstCommNumber = 0
+    for window, memberships in zip(windows, windowMemberships):
+        for (nodeIDs, edgeList), membership in zip(window, memberships):
+            partition = {nodeID: firstCommNumber + community for nodeID, community in zip(nodeIDs, membership)}
+            # isolated nodes should be their own community
+            connectedNodeIDs = {nodeID for source, target, weight in edgeList for nodeID in (source, target)}
+            if partition:
+                partition = assignNodesTheirOwnCommunity([nodeID for nodeID in nodeIDs if nodeID not in connectedNodeIDs], partition)
+            partitions.append(partition)
+        #the communities of the next window get numbers after all communities of this window
+        firstCommNumber = max((max(partition.values()) for partition in partitions if partition), default = -1) + 1
+
+    return partitions
+
+
+"""
+The community detection engine used for the temporal graph
+Uncomment the engine of your choice: the Leiden engine keeps its igraph graph from one snapshot to the next, 
+the networkx engine calls communityDetection (and the algorithm set there) for each snapshot
+If a number of processes is given, the component engine detects the communities of each connected component separately, the large components in parallel
+@param tolerance: only used by the Leiden engine, see LeidenCommunityEngine
+@param numberOfProcesses: None for a single process, otherwise the number of worker processes of the component engine
+@return community engine object with the functions detectCommunities(snapshot), getNumberOfSkippedSnapshots() and close()
+raises ValueError if both a tolerance and a number of processes are given, as the component engine detects the communities of every snapshot
+"""
+def createCommunityEngine(tolerance = None, numberOfProcesses = None):
+    if numberOfProcesses is not None:
+        if tolerance is not None:
+            raise ValueError("a tolerance cannot be combined with a number of processes: the component engine detects the communities of every snapshot")
+        return ComponentCommunityEngine(numberOfProcesses)
+
+    #Leiden
+    return LeidenCommunityEngine(tolerance)
+
+    #Louvain, Clauset Newman Moore, or Leiden as set in communityDetection
+    #return NetworkxCommunityEngine()
@@ -2,6 +2,7 @@
 import csv
 import io
 import argparse
+import itertools
 
 import time
 import re
@@ -14,15 +15,36 @@ import CollaborationSession
 import CollaborationEvent
 import WorkSession
 import WorkEvent
+import TimestampParser
+import EventStore
+import ParseCache
+
+
+"""
+Raised when a row of an input file cannot be parsed, for example because it refers to an unknown resource or object ID
+"""
+class DataParseError(Exception):
+    pass
+
 
 class DataParser:
     def __init__(self):
         self.resources = []
         self.objects = []
+        #registries with the numerical ID as key and the Resource or Object object as value: constant time lookups
+        self.resourceRegistry = {}
+        self.objectRegistry = {}
         self.collabSessions = []
         self.collabEvents = []
+        #dict with (frozenset of the resource pair, timestamp) as key and the CollaborationEvent object as value
+        self.collabEventIndex = {}
+        #EventStore object holding the collab events ordered in time, made when it is first requested or loaded from the cache
+        self.collabEventStore = None
         self.workSessions = []
         self.workEvents = []
+        #cached parsers for the timestamps of the collaboration sessions and the work sessions
+        self.collabTimestampParser = TimestampParser.TimestampParser("%d/%m/%Y %H:%M:%S")
+        self.workTimestampParser = TimestampParser.TimestampParser("%d/%m/%Y, %H:%M:%S")
 
 
     def getResourceList(self):
@@ -31,12 +53,30 @@ class DataParser:
     def getObjectList(self):
         return self.objects
 
+    #@return dict with the resource ID as key and the Resource object as value
+    def getResourceRegistry(self):
+        return self.resourceRegistry
+
+    #@return dict with the object ID as key and the Object object as value
+    def getObjectRegistry(self):
+        return self.objectRegistry
+
     def __getCollabSessionsList(self):
         return self.collabSessions
 
     def getCollabEventsList(self):
+        #when the data is loaded from the cache, the collab events only exist in the event store
+        if not self.collabEvents and self.collabEventStore is not None:
+            self.collabEvents = [self.collabEventStore.getCollabEvent(i) for i in range(self.collabEventStore.getNumberOfEvents())]
         return self.collabEvents
 
+    #@return EventStore object holding the collab events ordered on their event timestamp
+    def getCollabEventStore(self):
+        if self.collabEventStore is None:
+            collabEvents = sorted(self.collabEvents, key= lambda x: x.getEventTimestamp())
+            self.collabEventStore = EventStore.buildEventStore(self.resources, self.objects, collabEvents)
+        return self.collabEventStore
+
     def getWorkEventsList(self):
         return self.workEvents
 
@@ -44,14 +84,50 @@ class DataParser:
     #@param objectsFile: CSV file of all objects with their ID
     #@param collabSessionsFile: CSV file of all collab sessions
     #@param workSessionsFile:  CSV file of all work sessions
-    def parseAllData(self,resourcesFile,objectsFile, collabSessionsFile, workSessionsFile):
+    #@param streaming: if True, the collab sessions file is read in chunks and turned into collab events directly (see __streamCollabSessions)
+    #@param keepCollabSessions: only used when streaming: whether the CollaborationSession objects are kept as well
+    #@param chunkSize: only used when streaming: number of rows of the collab sessions file that are read at once
+    #@param cacheDirectory: if set, the parsed resources, objects and events are loaded from or saved to a cache file in this directory
+    #                       Note: the collaboration and work sessions themselves are not cached
+    def parseAllData(self,resourcesFile,objectsFile, collabSessionsFile, workSessionsFile, streaming = False, keepCollabSessions = False, chunkSize = 10000, cacheDirectory = None):
+        cacheFile = None
+        if cacheDirectory:
+            cacheFile = ParseCache.getCacheFileName(cacheDirectory, [resourcesFile, objectsFile, collabSessionsFile, workSessionsFile])
+            cachedData = ParseCache.loadParsedData(cacheFile)
+            if cachedData:
+                self.__restoreParsedData(*cachedData)
+                return
+
         self.__parseResources(resourcesFile)
         self.__parseObjects(objectsFile)
-        self.__parseCollabSessions(collabSessionsFile)
-        self.__createCollabEvents()
+        if streaming:
+            self.__streamCollabSessions(collabSessionsFile, keepCollabSessions, chunkSize)
+        else:
+            self.__parseCollabSessions(collabSessionsFile)
+            self.__createCollabEvents()
         self.__parseWorkSessions(workSessionsFile)
         self.__createWorkEvents()
 
+        if cacheFile:
+            ParseCache.saveParsedData(cacheFile, self.getCollabEventStore(), self.workEvents)
+
+    """
+    Set the parsed data that is loaded from the cache
+    @param resources: list of Resource objects
+    @param objects: list of Object objects
+    @param collabEventStore: EventStore object holding the collab events
+    @param workEvents: list of WorkEvent objects
+    """
+    def __restoreParsedData(self, resources, objects, collabEventStore, workEvents):
+        for resource in resources:
+            self.resources.append(resource)
+            self.resourceRegistry.setdefault(resource.getID(), resource)
+        for obj in objects:
+            self.objects.append(obj)
+            self.objectRegistry.setdefault(obj.getID(), obj)
+        self.collabEventStore = collabEventStore
+        self.workEvents = workEvents
+
     def __parseResources(self, resourcesFile):
         file = resourcesFile
         try:
@@ -67,7 +143,7 @@ class DataParser:
                         self.makeResource(int(row[0]), row[1])
 
 
-        except Exception as e:
+        except FileNotFoundError as e:
             print('File does not exist. Please provide the correct resource CSV file name.')
 
 
@@ -78,6 +154,8 @@ class DataParser:
     def makeResource(self, id, label):
         resource = Resource.Resource(id, label)
         self.resources.append(resource)
+        #the first resource with this ID is the one that is found when looking up the ID
+        self.resourceRegistry.setdefault(id, resource)
 
 
     #Parser for a CSV file with objects: first ID, then object label
@@ -97,7 +175,7 @@ class DataParser:
                         self.makeObject(int(row[0]), row[1])
 
 
-        except Exception as e:
+        except FileNotFoundError as e:
             print('File does not exist. Please provide the correct object CSV file name.')
 
 
@@ -110,6 +188,8 @@ class DataParser:
     def makeObject(self, id, label):
         obj = Object.Object(id,label)
         self.objects.append(obj)
+        # the first object with this ID is the one that is found when looking up the ID
+        self.objectRegistry.setdefault(id, obj)
 
     #parser for CSV file containing collaboration sessions
     #@param collabSessionsFile:
@@ -130,7 +210,46 @@ class DataParser:
                         self.makeCollabSession(int(row[0]), row[1], int(row[2]),row[3],int(row[4]),row[5],row[6],row[7],row[8])
 
 
-        except Exception as e:
+        except DataParseError as e:
+            #the caller decides what to do with a file that cannot be parsed, it gets the file and the line in the message
+            raise DataParseError("Parse error in " + str(file) + " on line " + str(csv_reader.line_num) + ": " + str(e)) from e
+        except FileNotFoundError as e:
+            print('File does not exist. Please provide the correct collaboration sessions CSV file name.')
+            print(e)
+
+    """
+    Streaming parser for the CSV file containing collaboration sessions
+    The rows are read in chunks and each session is converted to a collab event right away, 
+    so the memory needed depends on the number of collab events and not on the size of the file 
+    @param collabSessionsFile: CSV file containing the collaboration sessions
+    @param keepCollabSessions: whether the CollaborationSession objects are kept in the session list and added to the resources
+    @param chunkSize: number of rows that are read at once
+    """
+    def __streamCollabSessions(self, collabSessionsFile, keepCollabSessions, chunkSize):
+
+        file = collabSessionsFile
+
+        try:
+            with io.open(file, encoding="utf-8") as csv_file:
+                csv_reader = csv.reader(csv_file, delimiter=";")
+                #skip the header
+                next(csv_reader, None)
+
+                #each row is kept with its line number, as the reader is already at the end of the chunk when the rows are parsed
+                chunk = [(csv_reader.line_num, row) for row in itertools.islice(csv_reader, chunkSize)]
+                while chunk:
+                    for lineNumber, row in chunk:
+                        collabSession = self.__buildCollabSession(int(row[0]), int(row[2]), int(row[4]), row[6], row[7], row[8])
+                        if keepCollabSessions:
+                            self.__storeCollabSession(collabSession)
+                        self.__addToCollabEvents(collabSession)
+                    chunk = [(csv_reader.line_num, row) for row in itertools.islice(csv_reader, chunkSize)]
+
+
+        except DataParseError as e:
+            #the caller decides what to do with a file that cannot be parsed, it gets the file and the line in the message
+            raise DataParseError("Parse error in " + str(file) + " on line " + str(lineNumber) + ": " + str(e)) from e
+        except FileNotFoundError as e:
             print('File does not exist. Please provide the correct collaboration sessions CSV file name.')
             print(e)
 
@@ -148,6 +267,11 @@ class DataParser:
     #@param lastTmstp: string containing the last timestamp of the session
     #@param medianTmstp: string containing the median timestamp of the session
     def makeCollabSession(self,resourceID1, resourceLabel1, resourceID2, resourceLabel2, objectID, objectLabel, firstTmstp, lastTmstp, medianTmstp):
+        collabSession = self.__buildCollabSession(resourceID1, resourceID2, objectID, firstTmstp, lastTmstp, medianTmstp)
+        self.__storeCollabSession(collabSession)
+
+    #@return a CollaborationSession object for these IDs and timestamp strings, without storing it
+    def __buildCollabSession(self, resourceID1, resourceID2, objectID, firstTmstp, lastTmstp, medianTmstp):
         #find resources
         resource1 = self.findResourceByID(resourceID1)
         resource2 = self.findResourceByID(resourceID2)
@@ -155,17 +279,20 @@ class DataParser:
         obj = self.findObjectByID(objectID)
 
         #convert timestamps
-        firstTimestamp = datetime.strptime(firstTmstp,"%d/%m/%Y %H:%M:%S")
-        lastTimestamp =  datetime.strptime(lastTmstp,"%d/%m/%Y %H:%M:%S")
-        medianTimestamp =  datetime.strptime(medianTmstp,"%d/%m/%Y %H:%M:%S")
+        firstTimestamp = self.collabTimestampParser.parse(firstTmstp)
+        lastTimestamp =  self.collabTimestampParser.parse(lastTmstp)
+        medianTimestamp =  self.collabTimestampParser.parse(medianTmstp)
 
         #make collab session object
-        collabSession = CollaborationSession.CollaborationSession(resource1, resource2,obj,firstTimestamp, lastTimestamp, medianTimestamp)
+        return CollaborationSession.CollaborationSession(resource1, resource2,obj,firstTimestamp, lastTimestamp, medianTimestamp)
+
+    #Add the CollaborationSession object to the session list and to both of its resources
+    def __storeCollabSession(self, collabSession):
         self.collabSessions.append(collabSession)
 
         #also add it to resources
-        resource1.addCollabSession(collabSession)
-        resource2.addCollabSession(collabSession)
+        collabSession.getSource().addCollabSession(collabSession)
+        collabSession.getTarget().addCollabSession(collabSession)
 
     """
     Collaboration sessions are between 2 resources on a single object and have a duration.
@@ -176,22 +303,27 @@ class DataParser:
     def __createCollabEvents(self):
         #create for each collaboration session a collab event EXCEPT if the resource pair and timestamp is the same
         for cs in self.collabSessions:
-            resource1 = cs.getSource()
-            resource2 = cs.getTarget()
-            #we set the timestamp of the collab event to the first timestamp
-            #other options could be: last and median timestamp
-            timestamp = cs.getFirstTimestamp()
-            object = cs.getObject()
-              #search if there is already a collab event with this session's details
-            ce = self.searchCollabEvent(resource1,resource2,timestamp)
-            #if there is no existing collab event between the resources at this timestamp, create a new one
-            if not ce:
-                #else make a CollaborationEvent object
-                collabEvent = CollaborationEvent.CollaborationEvent(resource1, resource2,timestamp,object)
-                self.collabEvents.append(collabEvent)
-            else:
-                #just add this object to the collab event
-                ce.addObject(object)
+            self.__addToCollabEvents(cs)
+
+    #Create a collab event for this CollaborationSession object or add its object to the existing collab event of the resource pair at that timestamp
+    def __addToCollabEvents(self, cs):
+        resource1 = cs.getSource()
+        resource2 = cs.getTarget()
+        #we set the timestamp of the collab event to the first timestamp
+        #other options could be: last and median timestamp
+        timestamp = cs.getFirstTimestamp()
+        object = cs.getObject()
+          #search if there is already a collab event with this session's details
+        ce = self.searchCollabEvent(resource1,resource2,timestamp)
+        #if there is no existing collab event between the resources at this timestamp, create a new one
+        if not ce:
+            #else make a CollaborationEvent object
+            collabEvent = CollaborationEvent.CollaborationEvent(resource1, resource2,timestamp,object)
+            self.collabEvents.append(collabEvent)
+            self.collabEventIndex[self.__collabEventKey(resource1,resource2,timestamp)] = collabEvent
+        else:
+            #just add this object to the collab event
+            ce.addObject(object)
 
 
 
@@ -200,6 +332,9 @@ class DataParser:
     def __parseWorkSessions(self, workSessionsFile):
 
         file = workSessionsFile
+        if file is None:
+            print("No file with work sessions is provided. Resource recruitment will be done based on a resource's first collaboration event.")
+            return
 
         try:
             with io.open(file, encoding="utf-8") as csv_file:
@@ -214,7 +349,10 @@ class DataParser:
                         self.__makeWorkSession(int(row[0]), row[1], row[2],row[3],row[4])
 
 
-        except Exception as e:
+        except DataParseError as e:
+            #the caller decides what to do with a file that cannot be parsed, it gets the file and the line in the message
+            raise DataParseError("Parse error in " + str(file) + " on line " + str(csv_reader.line_num) + ": " + str(e)) from e
+        except FileNotFoundError as e:
             print("No file with work sessions is provided. Resource recruitment will be done based on a resource's first collaboration event.")
             print(e)
 
@@ -231,9 +369,9 @@ class DataParser:
 
 
         #convert timestamps
-        firstTimestamp = datetime.strptime(firstTmstp,"%d/%m/%Y, %H:%M:%S")
-        lastTimestamp =  datetime.strptime(lastTmstp,"%d/%m/%Y, %H:%M:%S")
-        medianTimestamp =  datetime.strptime(medianTmstp,"%d/%m/%Y, %H:%M:%S")
+        firstTimestamp = self.workTimestampParser.parse(firstTmstp)
+        lastTimestamp =  self.workTimestampParser.parse(lastTmstp)
+        medianTimestamp =  self.workTimestampParser.parse(medianTmstp)
 
         #make work session object
         workSession = WorkSession.WorkSession(resource,firstTimestamp, lastTimestamp, medianTimestamp)
@@ -268,25 +406,32 @@ class DataParser:
     @return CollaborationEvent object that is between these 2 resources at that timestamp OR None if that doesn't exist
     """
     def searchCollabEvent(self,resource1,resource2, timestamp):
-        ces = [x for x in self.collabEvents if (x.concernsResources(resource1,resource2) and x.getEventTimestamp() == timestamp)]
-        if not ces:
-            return None
-        else :
-            return ces[0]
+        return self.collabEventIndex.get(self.__collabEventKey(resource1,resource2,timestamp))
+
+    """
+    The resource pair is unordered: a collaboration event between resource1 and resource2 is the same as one between resource2 and resource1
+    @return hashable key of the collaboration event between these 2 resources at that timestamp
+    """
+    def __collabEventKey(self,resource1,resource2,timestamp):
+        return (frozenset((resource1,resource2)),timestamp)
 
     #@param ID of resource
     #@returns Resource object with that ID
+    #raises DataParseError if no resource with that ID exists
     def findResourceByID(self, ID):
-        for resource in self.resources:
-            if ID == resource.getID():
-                return resource
+        resource = self.resourceRegistry.get(ID)
+        if resource is None:
+            raise DataParseError("unknown resource ID " + str(ID) + ", all resources must appear in the resource file")
+        return resource
 
     #@param ID of object
     #@returns Object object with that ID
+    #raises DataParseError if no object with that ID exists
     def findObjectByID(self,ID):
-        for object in self.objects:
-            if ID == object.getID():
-                return object
+        obj = self.objectRegistry.get(ID)
+        if obj is None:
+            raise DataParseError("unknown object ID " + str(ID) + ", all objects must appear in the object file")
+        return obj
 
 
 
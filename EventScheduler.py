@@ -0,0 +1,84 @@
+#Scheduler for the moments at which a new graph snapshot must be taken
+#Merges the collaboration events, the node pop up events and the edge removal events in a single min-heap
+import heapq
+import itertools
+
+#kinds of scheduled events
+INTERACTION = 0
+NODE_POPUP = 1
+EDGE_REMOVAL = 2
+
+
+class EventScheduler:
+
+    """
+    @param eventStore: EventStore object holding the collaboration events ordered in time
+    @param resourcePopUpTime: dict with Resource object as key and the timestamp (datetime object) it first appears as value
+    """
+    def __init__(self, eventStore, resourcePopUpTime):
+        self.eventStore = eventStore
+        #heap of tuples (timestamp, sequence number, kind of event, key): the sequence number keeps keys from being compared
+        self.heap = []
+        self.counter = itertools.count()
+
+        #dict with Edge object as key and the timestamp at which it will disappear as value
+        #an edge removal entry on the heap is only valid if its timestamp is still the one in this dict (lazy invalidation)
+        self.edgeRemovalTimes = {}
+
+        for resource, timestamp in resourcePopUpTime.items():
+            self.__push(timestamp, NODE_POPUP, resource)
+
+        #only the next interaction timestamp is on the heap, the next one is pushed when it has passed
+        firstInteraction = self.eventStore.getEventTimestamp(0) if self.eventStore.getNumberOfEvents() else None
+        if firstInteraction is not None:
+            self.__push(firstInteraction, INTERACTION, None)
+
+
+    def getEdgeRemovalTimes(self):
+        return self.edgeRemovalTimes
+
+    """
+    Schedule (or reschedule) the removal of an edge
+    @param edge: Edge object
+    @param timestamp: datetime object of the moment the edge disappears
+    """
+    def scheduleEdgeRemoval(self, edge, timestamp):
+        self.edgeRemovalTimes[edge] = timestamp
+        self.__push(timestamp, EDGE_REMOVAL, edge)
+
+    """
+    Cancel the removal of an edge that does not exist anymore, its entry on the heap becomes invalid
+    @param edge: Edge object
+    """
+    def cancelEdgeRemoval(self, edge):
+        del self.edgeRemovalTimes[edge]
+
+    """
+    Find the first event (collaboration event, node pop up, or edge removal) within ]beginTS, endTS]
+    Entries at or before beginTS have passed and are popped from the heap; the scheduler is meant to be queried with a beginTS that only moves forward in time
+    @param beginTS datetime object of first timestamp of window
+    @param endTS datetime object of last timestamp of window
+    @returns the timestamp of the first event within the window or None
+    """
+    def searchNextEventTimestamp(self, beginTS, endTS):
+        while self.heap:
+            timestamp, sequence, kind, key = self.heap[0]
+            if timestamp > beginTS and (kind != EDGE_REMOVAL or self.edgeRemovalTimes.get(key) == timestamp):
+                break
+            heapq.heappop(self.heap)
+            if kind == INTERACTION:
+                #replace by the first interaction after beginTS
+                nextInteraction = self.eventStore.searchNextEventTimestamp(max(timestamp, beginTS), self.__lastInteractionTimestamp())
+                if nextInteraction is not None:
+                    self.__push(nextInteraction, INTERACTION, None)
+
+        if self.heap and self.heap[0][0] <= endTS:
+            return self.heap[0][0]
+        return None
+
+
+    def __push(self, timestamp, kind, key):
+        heapq.heappush(self.heap, (timestamp, next(self.counter), kind, key))
+
+    def __lastInteractionTimestamp(self):
+        return self.eventStore.getEventTimestamp(self.eventStore.getNumberOfEvents() - 1)
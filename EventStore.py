@@ -0,0 +1,225 @@
+#Columnar storage of the collaboration events
+#Instead of a list of CollaborationEvent objects, the events are kept as NumPy arrays ordered in time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import CollaborationEvent
+
+#timestamps are stored as the number of seconds since this moment
+EPOCH = datetime(1970, 1, 1)
+
+
+"""
+@param timestamp: datetime object
+@return number of seconds between EPOCH and the timestamp, rounded down
+"""
+def toEpochSeconds(timestamp):
+    return (timestamp - EPOCH) // timedelta(seconds=1)
+
+
+"""
+@param timestamp: datetime object
+@return number of microseconds between EPOCH and the timestamp
+"""
+def toEpochMicroseconds(timestamp):
+    return (timestamp - EPOCH) // timedelta(microseconds=1)
+
+
+"""
+@param seconds: number of seconds since EPOCH
+@return datetime object
+"""
+def fromEpochSeconds(seconds):
+    return EPOCH + timedelta(seconds=int(seconds))
+
+
+"""
+Build the columnar store from a list of collaboration events
+@param resources: list of Resource objects, the position in the list is the index of the resource in the store
+@param objects: list of Object objects, the position in the list is the index of the object in the store
+@param collabEvents: list of CollaborationEvent objects, must be sorted on their event timestamp
+@return EventStore object holding the events
+"""
+def buildEventStore(resources, objects, collabEvents):
+    resources = list(resources)
+    objects = list(objects)
+    resourceIndex = {resource: i for i, resource in enumerate(resources)}
+    objectIndex = {obj: i for i, obj in enumerate(objects)}
+
+    numberOfEvents = len(collabEvents)
+    timestamps = np.empty(numberOfEvents, dtype=np.int64)
+    sources = np.empty(numberOfEvents, dtype=np.int32)
+    targets = np.empty(numberOfEvents, dtype=np.int32)
+    objectOffsets = np.zeros(numberOfEvents + 1, dtype=np.int64)
+    objectIndices = []
+
+    for i, ce in enumerate(collabEvents):
+        resource1, resource2 = ce.getTupleFormat()
+        timestamps[i] = toEpochSeconds(ce.getEventTimestamp())
+        sources[i] = findOrAddIndex(resource1, resourceIndex, resources)
+        targets[i] = findOrAddIndex(resource2, resourceIndex, resources)
+        for obj in ce.objectList:
+            objectIndices.append(findOrAddIndex(obj, objectIndex, objects))
+        objectOffsets[i + 1] = len(objectIndices)
+
+    return EventStore(resources, objects, timestamps, sources, targets, objectOffsets, np.array(objectIndices, dtype=np.int32))
+
+
+"""
+@return the index of item in the list; items that are not in the list yet are appended
+"""
+def findOrAddIndex(item, index, items):
+    i = index.get(item)
+    if i is None:
+        i = len(items)
+        index[item] = i
+        items.append(item)
+    return i
+
+
+class EventStore:
+
+    """
+    @param resources: list of Resource objects, indexed by the values in sources and targets
+    @param objects: list of Object objects, indexed by the values in objectIndices
+    @param timestamps: int64 array with the event timestamps in seconds since EPOCH, sorted
+    @param sources: int32 array with the index of the source resource of each event
+    @param targets: int32 array with the index of the target resource of each event
+    @param objectOffsets: int64 array of length number of events + 1: the objects of event i are objectIndices[objectOffsets[i]:objectOffsets[i+1]]
+    @param objectIndices: int32 array with the object indices of all events
+    """
+    def __init__(self, resources, objects, timestamps, sources, targets, objectOffsets, objectIndices):
+        self.resources = resources
+        self.objects = objects
+        self.timestamps = timestamps
+        self.sources = sources
+        self.targets = targets
+        self.objectOffsets = objectOffsets
+        self.objectIndices = objectIndices
+        #dict with the timestamp in seconds as key and the tuple (first index, last index + 1) of the events at that timestamp as value
+        #made by buildTimestampIndex
+        self.timestampIndex = None
+
+    def getNumberOfEvents(self):
+        return len(self.timestamps)
+
+    def getResources(self):
+        return self.resources
+
+    def getObjects(self):
+        return self.objects
+
+    def getTimestamps(self):
+        return self.timestamps
+
+    def getSources(self):
+        return self.sources
+
+    def getTargets(self):
+        return self.targets
+
+    def getObjectOffsets(self):
+        return self.objectOffsets
+
+    def getObjectIndices(self):
+        return self.objectIndices
+
+    """
+    @param i: index of the event
+    @return datetime object of the event timestamp
+    """
+    def getEventTimestamp(self, i):
+        return fromEpochSeconds(self.timestamps[i])
+
+    """
+    @param i: index of the event
+    @return tuple of the source and target Resource objects of the event
+    """
+    def getResourcePair(self, i):
+        return (self.resources[self.sources[i]], self.resources[self.targets[i]])
+
+    """
+    @param i: index of the event
+    @return list of Object objects the event concerns
+    """
+    def getEventObjects(self, i):
+        return [self.objects[j] for j in self.objectIndices[self.objectOffsets[i]:self.objectOffsets[i + 1]]]
+
+    """
+    @param i: index of the event
+    @return CollaborationEvent object for the event
+    """
+    def getCollabEvent(self, i):
+        resource1, resource2 = self.getResourcePair(i)
+        objects = self.getEventObjects(i)
+        collabEvent = CollaborationEvent.CollaborationEvent(resource1, resource2, self.getEventTimestamp(i), objects[0])
+        for obj in objects[1:]:
+            collabEvent.addObject(obj)
+        return collabEvent
+
+    """
+    @param beginTS: datetime object of first timestamp of window (excluded)
+    @param endTS: datetime object of last timestamp of window (included)
+    @return array with the indices of the events within ]beginTS, endTS]
+    """
+    def getEventIndicesInRange(self, beginTS, endTS):
+        #the timestamps are sorted: binary search for both ends of the window
+        first = self.findFirstEventIndexAfter(beginTS)
+        last = self.findFirstEventIndexAfter(endTS)
+        return np.arange(first, max(first, last))
+
+    """
+    @param TS: datetime object
+    @return index of the first event that takes place strictly after TS, or the number of events if there is none
+    """
+    def findFirstEventIndexAfter(self, TS):
+        #timestamps are whole seconds: t > TS if t > floor(TS)
+        return int(np.searchsorted(self.timestamps, toEpochSeconds(TS), side="right"))
+
+    """
+    @param beginTS: datetime object of first timestamp of window (excluded)
+    @param endTS: datetime object of last timestamp of window (included)
+    @return datetime object of the first event within ]beginTS, endTS] or None if there is none
+    """
+    def searchNextEventTimestamp(self, beginTS, endTS):
+        i = self.findFirstEventIndexAfter(beginTS)
+        #t <= endTS if t <= floor(endTS)
+        if i < len(self.timestamps) and self.timestamps[i] <= toEpochSeconds(endTS):
+            return self.getEventTimestamp(i)
+        return None
+
+    """
+    Group the events on their timestamp, so the events at a timestamp can be found without searching
+    The timestamps are sorted, so the events at the same timestamp are a contiguous range of indices
+    """
+    def buildTimestampIndex(self):
+        uniqueTimestamps, starts = np.unique(self.timestamps, return_index=True)
+        ends = np.append(starts[1:], len(self.timestamps))
+        self.timestampIndex = dict(zip(uniqueTimestamps.tolist(), zip(starts.tolist(), ends.tolist())))
+
+    """
+    @param TS: datetime object
+    @return range with the indices of the events that take place at TS
+    """
+    def getEventIndicesAtTimestamp(self, TS):
+        if self.timestampIndex is None:
+            self.buildTimestampIndex()
+        #event timestamps are whole seconds
+        if TS.microsecond:
+            return range(0)
+        first, end = self.timestampIndex.get(toEpochSeconds(TS), (0, 0))
+        return range(first, end)
+
+    """
+    The resources of each event are visited in the order source, target
+    @return list of tuples (Resource object, datetime object of its first event) in the order in which the resources first appear
+    """
+    def getFirstAppearances(self):
+        #interleave sources and targets: position 2i is the source of event i, position 2i+1 its target
+        interleaved = np.empty(2 * self.getNumberOfEvents(), dtype=np.int32)
+        interleaved[0::2] = self.sources
+        interleaved[1::2] = self.targets
+        resourceIndices, firstPositions = np.unique(interleaved, return_index=True)
+        order = np.argsort(firstPositions, kind="stable")
+        return [(self.resources[resourceIndices[i]], self.getEventTimestamp(firstPositions[i] // 2)) for i in order]
@@ -1,4 +1,5 @@
 # Handle the membership change 'expansion'
+import bisect
 import copy
 
 import MembershipChange
@@ -9,6 +10,11 @@ class ExpansionChange(MembershipChange.MembershipChange):
 
     def __init__(self):
         self.membershipChanges = []
+        #index of the expansion changes per resource, used by findFirstExpansionChange
+        #dict with resource ID as key and a tuple (list of timestamps, list of the expansion changes at these timestamps) sorted on timestamp as value
+        self.changesPerResource = {}
+        #number of changes at the start of membershipChanges that are in the index
+        self.numberOfIndexedChanges = 0
 
     """
     Detect expansion membership change
@@ -24,7 +30,7 @@ class ExpansionChange(MembershipChange.MembershipChange):
 
             if previousSnapshot:
                 #compare wih the previous snapshot
-                self.compareSnapshots(previousSnapshot,graph,temporalGraph.getGraphTeamMatches(graph))
+                self.membershipChanges.extend(self.compareSnapshots(previousSnapshot,graph,temporalGraph.getGraphTeamMatches(graph)))
 
             previousSnapshot = graph
 
@@ -36,12 +42,13 @@ class ExpansionChange(MembershipChange.MembershipChange):
     """
     Compare the previous graph snapshot with the current 
     Search for expansion events between the teams 
-    Add expansion events to self.membershipChanges
     @param previousGraph : Graph object representing the previous snapshot
     @param graph : Graph object representing the current snapshot 
     @param teamMatches:  list of tuples containing a set of nodes that form a group in the previous snapshot, and a set of node IDs that form a group in this graph 
+    @return list of the changes found between the two snapshots
     """
     def compareSnapshots(self,previousGraph,graph, teamMatches):
+        changes = []
         for match in teamMatches:
             oldTeam = match[0]
             newTeam = match[1]
@@ -56,7 +63,7 @@ class ExpansionChange(MembershipChange.MembershipChange):
                     #For now: each new member is an expansion event
                     #Currently not implemented: subgroup expansion and other higher level events
                     for element in newMembers:
-                        self.membershipChanges.append(dict({"timestamp":graph.getTimestamp(),"resource": element, "addedToGroup": oldTeam,"resultingGroup": newTeam ,"graphSnapshot": graph}))
+                        changes.append(dict({"timestamp":graph.getTimestamp(),"resource": element, "addedToGroup": oldTeam,"resultingGroup": newTeam ,"graphSnapshot": graph}))
 
 
 
@@ -71,6 +78,15 @@ class ExpansionChange(MembershipChange.MembershipChange):
                         #if you wish to handle this in a different way, this is the place to edit
                         pass
 
+        return changes
+
+    """
+    Detect the changes between two consecutive snapshots, used when the snapshots are processed one at a time
+    @return list of the changes found between the two snapshots
+    """
+    def detectChangesBetweenSnapshots(self, previousGraph, graph, teamMatches, expansionChanges, expulsionChanges):
+        return self.compareSnapshots(previousGraph, graph, teamMatches)
+
 
     """
     Find if an expansion change took place between the timestamp and timestamp + timewindow of this resource   (the first in the window) 
@@ -80,21 +96,28 @@ class ExpansionChange(MembershipChange.MembershipChange):
     @return the the first expansion event in the window   or None
     """
     def findFirstExpansionChange(self, resource, beginTimestamp,  timewindow):
-        expansionchanges = []
+        self.updateIndex()
         endTimestamp = beginTimestamp + timewindow
-        for change in self.membershipChanges:
-            #starting from the timestamp <=  and <= timewindow : we include instantaneous changes
-            if change["resource"] == resource and beginTimestamp <= change["timestamp"] and change["timestamp"] <= endTimestamp:
-                expansionchanges.append(change)
-
-
-        if expansionchanges:
-            #sort them on timestamp and return the first
-            expansionchanges.sort(key=lambda x: x["timestamp"])
-            return expansionchanges[0]
+        timestamps, changes = self.changesPerResource.get(resource, ([], []))
+        #starting from the timestamp <=  and <= timewindow : we include instantaneous changes
+        first = bisect.bisect_left(timestamps, beginTimestamp)
+        if first < len(timestamps) and timestamps[first] <= endTimestamp:
+            return changes[first]
         else:
             return None
 
+    """
+    Add the changes that were detected since the last update to the index per resource 
+    Changes with the same timestamp stay in the order in which they were detected 
+    """
+    def updateIndex(self):
+        for change in self.membershipChanges[self.numberOfIndexedChanges:]:
+            timestamps, changes = self.changesPerResource.setdefault(change["resource"], ([], []))
+            position = bisect.bisect_right(timestamps, change["timestamp"])
+            timestamps.insert(position, change["timestamp"])
+            changes.insert(position, change)
+        self.numberOfIndexedChanges = len(self.membershipChanges)
+
 
 
 
@@ -24,7 +24,7 @@ class ExpulsionChange(MembershipChange.MembershipChange):
 
             if previousSnapshot:
                 #compare wih the previous snapshot
-                self.compareSnapshots(previousSnapshot,graph,temporalGraph.getGraphTeamMatches(graph))
+                self.membershipChanges.extend(self.compareSnapshots(previousSnapshot,graph,temporalGraph.getGraphTeamMatches(graph)))
 
             previousSnapshot = graph
 
@@ -39,8 +39,10 @@ class ExpulsionChange(MembershipChange.MembershipChange):
     @param previousGraph : Graph object representing the previous snapshot
     @param graph : Graph object representing the current snapshot 
     @param teamMatches:  list of tuples containing a set of nodes that form a group in the previous snapshot, and a set of node IDs that form a group in this graph 
+    @return list of the changes found between the two snapshots
     """
     def compareSnapshots(self,previousGraph,graph, teamMatches):
+        changes = []
         for match in teamMatches:
             oldTeam = match[0]
             newTeam = match[1]
@@ -52,13 +54,16 @@ class ExpulsionChange(MembershipChange.MembershipChange):
                     #Currently not implemented: subgroup expulsion and other higher level events
 
                     for element in exMembers:
-                        self.membershipChanges.append(dict({"timestamp":graph.getTimestamp(),"resource": element, "removedFromGroup": oldTeam,"resultingGroup": newTeam , "graphSnapshot": graph}))
-
-
-
-
+                        changes.append(dict({"timestamp":graph.getTimestamp(),"resource": element, "removedFromGroup": oldTeam,"resultingGroup": newTeam , "graphSnapshot": graph}))
 
+        return changes
 
+    """
+    Detect the changes between two consecutive snapshots, used when the snapshots are processed one at a time
+    @return list of the changes found between the two snapshots
+    """
+    def detectChangesBetweenSnapshots(self, previousGraph, graph, teamMatches, expansionChanges, expulsionChanges):
+        return self.compareSnapshots(previousGraph, graph, teamMatches)
 
 
     """
@@ -1,8 +1,16 @@
 import Edge
 import TieStrengthHandler
 import Node
+import EventStore
 import sys
 import networkx as nx
+import numpy as np
+import weakref
+
+#initial number of edge slots in the arrays that hold the last event on each edge
+INITIAL_EDGE_CAPACITY = 64
+#time of a slot whose last event is not known to the graph yet
+UNKNOWN_EVENT_TIME = np.iinfo(np.int64).min
 
 class Graph:
 
@@ -20,6 +28,30 @@ class Graph:
         self.edgeWeights = edgeWeights
         self.currentWeightsTimestamp = currentWeightsTimestamp
 
+        #lookup structures next to the ordered node and edge lists, see the nodeMap, adjacency and neighborMap properties
+        #they are built on the first lookup, so snapshots that are never searched do not hold them
+        self.__nodeMap = None
+        self.__adjacency = None
+        self.__neighborMap = None
+
+        #the last event on each edge is kept in arrays, so all edges can be decayed at once
+        #every edge gets a slot in the arrays, the slots of removed edges are reused
+        #the arrays are made when the edges are first decayed or get an event, see __buildEdgeSlots
+        #dict with Edge object as key and its slot as value
+        self.edgeSlots = None
+        self.slotEdges = None
+        self.slotInUse = None
+        #time of the last event on the edge, in microseconds since EventStore.EPOCH
+        self.lastEventTimes = None
+        #weight of the edge at its last event
+        self.lastEventWeights = None
+        #number of slots that have been used so far
+        self.numberOfSlots = 0
+        self.freeSlots = []
+
+        #changes with respect to the graph this graph was made from, see setChanges
+        self.changes = None
+
         #These variables are set when teams are being detected
         #networkx graph representing this graph
         self.netwxGraph = None
@@ -31,24 +63,79 @@ class Graph:
     @return copy of this Graph object that isn't linked to this Graph object anymore, except for the Node and Edge object in the nodes and edges lists
     """
     def deepCopy(self):
-        #new list with same edge and nodes objects (these are still linked to this Graph object!)
-        nodes = []
-        for n in self.nodes:
-            nodes.append(n)
-        edges = []
-        for e in self.edges:
-            edges.append(e)
-
+        #new lists with same edge and nodes objects (these are still linked to this Graph object!)
         #medium deep copy of edgeweights : new dict, but linked Edge objects as keys
-        edgeWeights = {}
-        for e,w in self.edgeWeights.items():
-            edgeWeights[e] = w
-
         #deep copy of weights timestamp is not necessary, this is an immutable object
-
-        copyGraph = Graph(nodes,edges,edgeWeights,self.currentWeightsTimestamp)
+        copyGraph = Graph([],[],{},self.currentWeightsTimestamp)
+        copyGraph.nodes = list(self.nodes)
+        copyGraph.edges = list(self.edges)
+        copyGraph.edgeWeights = dict(self.edgeWeights)
+
+        #the copy is the graph that is changed next: the lookup structures move to the copy instead of being copied
+        #this graph builds them again if it is searched later
+        copyGraph.__nodeMap, copyGraph.__adjacency, copyGraph.__neighborMap = self.__nodeMap, self.__adjacency, self.__neighborMap
+        self.__nodeMap = self.__adjacency = self.__neighborMap = None
+
+        #the edge slots move to the copy as well, this graph makes them again if it is decayed later
+        copyGraph.edgeSlots, copyGraph.slotEdges, copyGraph.slotInUse = self.edgeSlots, self.slotEdges, self.slotInUse
+        copyGraph.lastEventTimes, copyGraph.lastEventWeights = self.lastEventTimes, self.lastEventWeights
+        copyGraph.numberOfSlots, copyGraph.freeSlots = self.numberOfSlots, self.freeSlots
+        self.edgeSlots = self.slotEdges = self.slotInUse = self.lastEventTimes = self.lastEventWeights = None
+        self.numberOfSlots = 0
+        self.freeSlots = []
         return copyGraph
 
+    #dict with the resource ID as key and the Node object as value
+    @property
+    def nodeMap(self):
+        self.__buildLookupStructures()
+        return self.__nodeMap
+
+    #dict with the frozenset of the two resource IDs as key and the Edge object between them as value
+    @property
+    def adjacency(self):
+        self.__buildLookupStructures()
+        return self.__adjacency
+
+    #dict with the resource ID as key and as value a dict with the neighbor IDs as keys and the connecting Edge objects as values
+    @property
+    def neighborMap(self):
+        self.__buildLookupStructures()
+        return self.__neighborMap
+
+    #Build the lookup structures from the node and edge lists, if they do not exist yet
+    def __buildLookupStructures(self):
+        if self.__nodeMap is not None:
+            return
+        self.__nodeMap = {}
+        self.__adjacency = {}
+        self.__neighborMap = {}
+        for node in self.nodes:
+            self.__addNodeToLookups(node)
+        for edge in self.edges:
+            self.__addEdgeToLookups(edge)
+
+    """
+    Record the changes with respect to the graph this graph was made from
+    Only a weak reference to that graph is kept, so the snapshots do not keep each other in memory
+    @param previousGraph: Graph object this graph was made from
+    @param addedNodes: list of Node objects that were added, in the order of the node list
+    @param removedEdges: list of Edge objects that were removed
+    @param addedEdges: list of Edge objects that were added, in the order of the edge list
+    """
+    def setChanges(self, previousGraph, addedNodes, removedEdges, addedEdges):
+        self.changes = (weakref.ref(previousGraph), addedNodes, removedEdges, addedEdges)
+
+    """
+    @param previousGraph: Graph object
+    @return tuple (list of added Node objects, list of removed Edge objects, list of added Edge objects) with respect to previousGraph,
+            or None if the changes with respect to previousGraph are not known
+    """
+    def getChangesSince(self, previousGraph):
+        if self.changes is None or previousGraph is None or self.changes[0]() is not previousGraph:
+            return None
+        return self.changes[1:]
+
     def getListOfNodeIDs(self):
         nodeIDs = [target.getID() for target in self.nodes]
         return nodeIDs
@@ -81,17 +168,13 @@ class Graph:
     @return list of resourceIDs that are neighbors of this resource 
     """
     def getNeighborIDs(self,resourceID):
-        neighbors = []
-        for edge in self.edges:
-            edgeIDs = edge.getTupleFormatIDonly()
-            if edgeIDs[0] == resourceID:
-                neighbors.append(edgeIDs[1])
-            elif edgeIDs[1] == resourceID:
-                neighbors.append(edgeIDs[0])
-        return neighbors
+        return list(self.neighborMap.get(resourceID, {}))
 
 
+    #the networkx graph is made when it is first requested
     def getNetworkxGraph(self):
+        if self.netwxGraph is None:
+            self.createNetworkxGraph()
         return self.netwxGraph
 
     def setCurrentWeightsTimestamp(self,timestamp):
@@ -128,8 +211,9 @@ class Graph:
     @param node: Node object representing a resource
     """
     def addNode(self,node):
-        if node not in self.nodes:
+        if node.getID() not in self.nodeMap:
             self.nodes.append(node)
+            self.__registerNode(node)
 
 
 
@@ -153,6 +237,7 @@ class Graph:
 
         newEdge = Edge.Edge(node1,node2)
         self.edges.append(newEdge)
+        self.__registerEdge(newEdge)
         #set the edge weight
         #add new edge to dictionary
         strength = tieStrengthHandler.handleInteraction(0)
@@ -160,12 +245,14 @@ class Graph:
         return newEdge
 
     #Remove this edge
+    #Note: removing it from the edge list takes a pass over the list, decayEdges removes all disappearing edges in one pass instead
     def removeEdge(self,edge):
         #remove from edgelist
         self.edges.remove(edge)
         #remove from edge weights dict
         del self.edgeWeights[edge]
-
+        #remove from the lookup structures and free its slot
+        self.__unregisterEdge(edge)
 
     """
     Create a new Node object 
@@ -174,19 +261,108 @@ class Graph:
     def createNewNode(self,resource):
         newNode = Node.Node(resource)
         self.nodes.append(newNode)
+        self.__registerNode(newNode)
         return newNode
+
+    #Add the node to the lookup structures, if they are built
+    def __registerNode(self, node):
+        if self.__nodeMap is not None:
+            self.__addNodeToLookups(node)
+
+    #Add the edge to the lookup structures and give it a slot, if they are built
+    def __registerEdge(self, edge):
+        if self.__nodeMap is not None:
+            self.__addEdgeToLookups(edge)
+        if self.edgeSlots is not None:
+            self.edgeSlots[edge] = self.__allocateSlot(edge)
+
+    def __addNodeToLookups(self, node):
+        self.__nodeMap[node.getID()] = node
+        self.__neighborMap.setdefault(node.getID(), {})
+
+    def __addEdgeToLookups(self, edge):
+        sourceID, targetID = edge.getTupleFormatIDonly()
+        self.__adjacency[frozenset((sourceID, targetID))] = edge
+        self.__neighborMap.setdefault(sourceID, {})[targetID] = edge
+        self.__neighborMap.setdefault(targetID, {})[sourceID] = edge
+
+    #Remove the edge from the lookup structures and free its slot, if they are built
+    def __unregisterEdge(self, edge):
+        if self.__nodeMap is not None:
+            sourceID, targetID = edge.getTupleFormatIDonly()
+            del self.__adjacency[frozenset((sourceID, targetID))]
+            del self.__neighborMap[sourceID][targetID]
+            self.__neighborMap[targetID].pop(sourceID, None)
+
+        if self.edgeSlots is not None:
+            slot = self.edgeSlots.pop(edge)
+            self.slotEdges[slot] = None
+            self.slotInUse[slot] = False
+            self.lastEventTimes[slot] = UNKNOWN_EVENT_TIME
+            self.freeSlots.append(slot)
+
+    #Make the last event arrays with a slot for every edge, if they do not exist yet
+    #the last events are not known yet, __syncLastEvents takes them from the dictionary
+    def __buildEdgeSlots(self):
+        if self.edgeSlots is not None:
+            return
+        self.edgeSlots = {}
+        self.slotEdges = np.empty(INITIAL_EDGE_CAPACITY, dtype=object)
+        self.slotInUse = np.zeros(INITIAL_EDGE_CAPACITY, dtype=bool)
+        self.lastEventTimes = np.full(INITIAL_EDGE_CAPACITY, UNKNOWN_EVENT_TIME, dtype=np.int64)
+        self.lastEventWeights = np.zeros(INITIAL_EDGE_CAPACITY, dtype=np.float64)
+        for edge in self.edges:
+            self.edgeSlots[edge] = self.__allocateSlot(edge)
+
+    #@return a free slot in the last event arrays for the edge, the arrays are doubled in size when they are full
+    def __allocateSlot(self, edge):
+        if self.freeSlots:
+            slot = self.freeSlots.pop()
+        else:
+            if self.numberOfSlots == len(self.slotInUse):
+                capacity = 2 * len(self.slotInUse)
+                slotEdges = np.empty(capacity, dtype=object)
+                slotEdges[:self.numberOfSlots] = self.slotEdges
+                self.slotEdges = slotEdges
+                self.slotInUse = np.resize(self.slotInUse, capacity)
+                self.slotInUse[self.numberOfSlots:] = False
+                self.lastEventTimes = np.resize(self.lastEventTimes, capacity)
+                self.lastEventTimes[self.numberOfSlots:] = UNKNOWN_EVENT_TIME
+                self.lastEventWeights = np.resize(self.lastEventWeights, capacity)
+            slot = self.numberOfSlots
+            self.numberOfSlots += 1
+        self.slotEdges[slot] = edge
+        self.slotInUse[slot] = True
+        return slot
+
+    """
+    Store the last event on the edge in the last event arrays
+    @param edge: Edge object
+    @param timestamp: datetime object of the last event on this edge
+    @param weight: weight of the edge at that point
+    """
+    def __setLastEvent(self, edge, timestamp, weight):
+        self.__buildEdgeSlots()
+        slot = self.edgeSlots[edge]
+        self.lastEventTimes[slot] = EventStore.toEpochMicroseconds(timestamp)
+        self.lastEventWeights[slot] = weight
+
+    """
+    Edges that were in the graph when the arrays were made have no last event in the arrays yet, take it from the dictionary
+    @param lastEventOnEdge: dictionary with Edge object as key and the timestamp of the last event on this edge and its weight at that point as values
+    """
+    def __syncLastEvents(self, lastEventOnEdge):
+        used = slice(0, self.numberOfSlots)
+        for slot in np.flatnonzero(self.slotInUse[used] & (self.lastEventTimes[used] == UNKNOWN_EVENT_TIME)):
+            edge = self.slotEdges[slot]
+            self.__setLastEvent(edge, *lastEventOnEdge[edge])
     """
     Find Node object that represents this resource 
     @param Resource object 
     @return the Node object or None if no node exists 
     """
     def findNode(self,resource):
-        node = [target for target in self.nodes if target.getResource()==resource]
-        if not node:
-            node = None
-        else:
-            node = node[0]
-        return node
+        return self.nodeMap.get(resource.getID())
 
     """
     Find edge between these two resources 
@@ -194,13 +370,8 @@ class Graph:
     @return either the edge between the resources or None if no such edge exists
     """
     def findEdge(self, resource1, resource2):
-        edges = [target for target in self.edges if target.connectsResources(resource1,resource2)]
-        #should only return 0 or 1  edge
-        if not edges:
-            edges = None
-        else:
-            edges = edges[0]
-        return edges
+        #there is only 0 or 1 edge between two resources
+        return self.adjacency.get(frozenset((resource1.getID(), resource2.getID())))
 
     """
     Find the weight of the edge 
@@ -248,8 +419,9 @@ class Graph:
                 #set the new edge weight
                 self.setEdgeWeight(edge,newStrengthValue)
 
-            #update this in the last event on edge dictionary
+            #update this in the last event on edge dictionary and arrays
             lastEventOnEdge[edge] = (currentTS,self.findEdgeWeight(edge))
+            self.__setLastEvent(edge, currentTS, self.findEdgeWeight(edge))
 
 
     """
@@ -263,35 +435,43 @@ class Graph:
     @return a list of Edge objects that are removed from the graph 
     """
     def decayEdges(self,tieStrengthHandler,targetTimestamp,lastEventOnEdge):
-        removedEdges = []
+        self.__buildEdgeSlots()
+        self.__syncLastEvents(lastEventOnEdge)
+        used = slice(0, self.numberOfSlots)
+        inUse = self.slotInUse[used]
 
-        #decay each edge
-        for edge in self.edges:
+        #get number of time steps between the timestamp of last event and current timestamp, for all edges at once
+        timeDifferences = EventStore.toEpochMicroseconds(targetTimestamp) - self.lastEventTimes[used]
+        #free slots have no last event
+        timeDifferences[~inUse] = 0
+        numberOfTimeSteps = tieStrengthHandler.calculateNumberOfTimeStepsBatch(timeDifferences)
+
+        #calculate new weights
+        newWeights = tieStrengthHandler.decayEdgeWeightBatch(self.lastEventWeights[used], numberOfTimeSteps)
+
+        #handle cutoff threshold : we choose < as if there is still an event at this timestamp, the edge weight increases by jump size instead of starting from 0
+        # interpretation: only strict after the given period of decay the edge disappears
+        disappears = inUse & (newWeights < tieStrengthHandler.getWeightCutoffThreshold())
+        stays = inUse & ~disappears
 
-            #get timestamp of last event on this edge and the weight of the edge at that point
-            lastEventTS, lastEventWeight = lastEventOnEdge[edge]
-            #get number of time steps between the timestamp of last event and current timestamp
-            numberOfTimeSteps = tieStrengthHandler.calculateNumberOfTimeSteps(lastEventTS, targetTimestamp)
-
-            #calculate new weight
-            newWeight = tieStrengthHandler.decayEdgeWeight(lastEventWeight,numberOfTimeSteps)
-            #set new weight
-            self.setEdgeWeight(edge,newWeight)
-
-            #handle cutoff threshold : we choose < as if there is still an event at this timestamp, the edge weight increases by jump size instead of starting from 0
-            # interpretation: only strict after the given period of decay the edge disappears
-            if newWeight < tieStrengthHandler.getWeightCutoffThreshold():
-                #edge disappears
-                self.removeEdge(edge)
-                removedEdges.append(edge)
+        #set new weights
+        self.edgeWeights.update(zip(self.slotEdges[used][stays].tolist(), newWeights[stays].tolist()))
+
+        #edges disappear, in the order of the edge list
+        removedEdges = []
+        if disappears.any():
+            disappearingEdges = set(self.slotEdges[used][disappears].tolist())
+            removedEdges = [edge for edge in self.edges if edge in disappearingEdges]
+            self.edges = [edge for edge in self.edges if edge not in disappearingEdges]
+            for edge in removedEdges:
+                del self.edgeWeights[edge]
+                self.__unregisterEdge(edge)
                 #remove also from last event on edge
                 del lastEventOnEdge[edge]
 
         return removedEdges
 
 
-
-
     """
     Handle all node events: for now only the appearance of new nodes in the graph
     @param listOfPopupResources: list of Resource objects that are new to the temporal graph and should be added as nodes
@@ -1,6 +1,12 @@
 #Class that focuses on parsing the data on resources, objects and event into temporal graphs
 import Graph
+import Node
+import Edge
 import TemporalGraph
+import EventStore
+import EventScheduler
+import SnapshotStore
+import PairEventIndex
 from datetime import datetime,timedelta
 import sys
 import CommunityDetection
@@ -14,7 +20,8 @@ class GraphEvolutionParser:
     @param resources:  list of Resource objects representing all resources in the graph
     @param objects:  list of Object objects representing all objects in the graph
     @param collabEvents:  list of CollaborationEvents objects representing all collaboration events between resources
-    These will be sorted here
+    These will be sorted here and stored in a columnar EventStore, which is used for all queries on the collaboration events
+    An EventStore object (for example from DataParser.getCollabEventStore) can be passed instead of the list 
     @param workEvents: list of WorkEvent objects representing all work events of all resources
     @param tieStrengthHandler: TieStrengthHandler object that holds all mechanisms of tie strength evolution
 
@@ -22,15 +29,25 @@ class GraphEvolutionParser:
     def __init__(self, resources, objects, collabEvents,workEvents, tieStrengthHandler):
         self.resources = resources
         self.objects = objects
-        #sort collab events
-        collabEvents = self.sortCollabEvents(collabEvents)
-        self.collabEvents = collabEvents
+        if isinstance(collabEvents, EventStore.EventStore):
+            self.eventStore = collabEvents
+        else:
+            #sort collab events
+            collabEvents = self.sortCollabEvents(collabEvents)
+            self.eventStore = EventStore.buildEventStore(resources, objects, collabEvents)
         workEvents = self.sortWorkEvents(workEvents)
         self.workEvents = workEvents
         #Filter out for each resource the timestamp at which they first appear (either work event or collaboration event)
         self.resourcePopUpTime = self.constructFirstResourceTimestampList()
+        #group the collaboration events and the pop up resources on their timestamp, so each snapshot only touches its own events
+        self.eventStore.buildTimestampIndex()
+        self.popupResourcesByTimestamp = self.groupPopUpResourcesByTimestamp()
         self.tieStrengthHandler = tieStrengthHandler
 
+        #scheduler that merges the collaboration events, node pop ups, and edge removals to find the next snapshot timestamp
+        #made at the start of each temporal graph (see generateSnapshots), as it is used up while the snapshots are created
+        self.eventScheduler = None
+
         #dict of when each edge will disappear
         self.edgeRemovalTimes = {}
 
@@ -38,6 +55,9 @@ class GraphEvolutionParser:
         #For each edge keep the timestamp of the last event on the edge and its weight at that point
         self.lastEventOnEdge = {}
 
+        #index of the events per pair of resources for weightAt and graphAt, made when it is first needed
+        self.pairEventIndex = None
+
 
 
 
@@ -71,13 +91,9 @@ class GraphEvolutionParser:
                 #add this event as it's the first we encounter
                 firstWorkEvents[resource] = we.getEventTimestamp()
 
-        #first collaboration event : the events are already ordered
-        for ce in self.collabEvents:
-            resource1, resource2 = ce.getTupleFormat()
-            if not resource1 in firstCollabEvents:
-                firstCollabEvents[resource1]= ce.getEventTimestamp()
-            if not resource2 in firstCollabEvents:
-                firstCollabEvents[resource2]= ce.getEventTimestamp()
+        #first collaboration event : in the order in which the resources appear in the ordered events
+        for resource, timestamp in self.eventStore.getFirstAppearances():
+            firstCollabEvents[resource] = timestamp
 
         #These two lines should not be necessary since all resources should at least have one work event!
         allResources = list(firstWorkEvents.keys())
@@ -107,6 +123,16 @@ class GraphEvolutionParser:
 
 
 
+    """
+    @return dict with timestamp (datetime object) as key and the list of Resource objects that first appear at that timestamp as value 
+    """
+    def groupPopUpResourcesByTimestamp(self):
+        popupResources = {}
+        for resource, timestamp in self.resourcePopUpTime.items():
+            popupResources.setdefault(timestamp, []).append(resource)
+        return popupResources
+
+
     """
     Create a TemporalGraph object representing the graphs for each time slice within the boundaries
     Each event will be a separate graph and if there is more than the time slice in between events, 
@@ -116,16 +142,46 @@ class GraphEvolutionParser:
     @param time_slice_unit: unit of measurement for the time slicing in minutes
             This does not have to be a multiple of the timestep variable
             This does not even have to be larger than the timestep variable in TieStrengthHandler, but most logically it will be larger as the timestep is one step in the decay function while the timeslice is a larger window over time where you want to see the evolution of the tie strength up until that point 
-    @returns TemporalGraph object representing the temporal graph 
+    @param deltaEncoded: if True, the snapshots are not copies of the graph but are kept as changes in a SnapshotStore and rebuilt when needed 
+            This keeps the memory use low for long periods
+    @param keyframeInterval: only used if deltaEncoded: number of snapshots between two full copies of the graph in the SnapshotStore
+    @param lazy: if True, no TemporalGraph object is made: a generator is returned that creates the snapshots one at a time when they are requested
+            Each snapshot is a separate Graph object, deltaEncoded is ignored; the snapshots are not kept, so the memory use does not grow with the length of the period 
+    @returns TemporalGraph object representing the temporal graph, or a generator of Graph objects ordered in time if lazy
     """
-    def createTemporalGraph(self,begin_timestamp, end_timestamp,time_slice_unit):
+    def createTemporalGraph(self,begin_timestamp, end_timestamp,time_slice_unit, deltaEncoded = False, keyframeInterval = 50, lazy = False):
+        if lazy:
+            return self.generateSnapshots(begin_timestamp, end_timestamp, time_slice_unit)
+
+        snapshotStore = None
+        if deltaEncoded:
+            snapshotStore = SnapshotStore.SnapshotStore(self.tieStrengthHandler, keyframeInterval)
+
         # (end_timestamp - begin_timestamp ) / time_slice_unit = how many graphs need to be added to the temporal graph
         #This is the length of the temporal graph
-        numberOfGraphs = 0
-        listOfGraphs = []
+        listOfGraphs = list(self.generateSnapshots(begin_timestamp, end_timestamp, time_slice_unit, snapshotStore))
+
+        #create the temporal graph object
+        temporalGraph = TemporalGraph.TemporalGraph(len(listOfGraphs),listOfGraphs)
+
+        return temporalGraph
+
+    """
+    Create the graph snapshots one at a time, see createTemporalGraph 
+    @param begin_timestamp 
+    @param end_timestamp 
+    @param time_slice_unit: unit of measurement for the time slicing in minutes
+    @param snapshotStore: SnapshotStore object to record the snapshots in, or None to make a copy of the graph for each snapshot
+    @returns generator of Graph objects ordered in time
+    """
+    def generateSnapshots(self, begin_timestamp, end_timestamp, time_slice_unit, snapshotStore = None):
+        #each temporal graph starts from an empty graph: start with a new scheduler and no edges
+        self.eventScheduler = EventScheduler.EventScheduler(self.eventStore, self.resourcePopUpTime)
+        self.edgeRemovalTimes = self.eventScheduler.getEdgeRemovalTimes()
+        self.lastEventOnEdge = {}
 
         #make the first empty graph
-        g = Graph.Graph()
+        g = Graph.Graph([],[],{})
         #set the current time as the current graph timestamp
         g.setCurrentWeightsTimestamp(begin_timestamp)
 
@@ -134,24 +190,19 @@ class GraphEvolutionParser:
         endReached = False
         while not endReached:
             #make a new snapshot , returns the snapshot Graph object and the new point in time we're currently at
-            snapshot,currentTime = self.makeNewSnapshot(currentTime,time_slice_unit,end_timestamp,g)
+            snapshot,currentTime = self.makeNewSnapshot(currentTime,time_slice_unit,end_timestamp,g,snapshotStore)
             if snapshot:
 
-                #add to list of graph object
-                listOfGraphs.append(snapshot)
-                numberOfGraphs += 1
+                yield snapshot
                 #set new snapshot as the current last graph
-                g = snapshot
+                #if delta encoded, g is a working graph that is updated in place and the snapshot is only a view on the store
+                if snapshotStore is None:
+                    g = snapshot
 
             #if we reached the end timestamp, stop creating snapshots
             if currentTime == end_timestamp :
                 endReached = True
 
-        #create the temporal graph object
-        temporalGraph = TemporalGraph.TemporalGraph(numberOfGraphs,listOfGraphs)
-
-        return temporalGraph
-
 
 
     """
@@ -159,10 +210,11 @@ class GraphEvolutionParser:
     @param timeSliceUnit:  the time slice in minutes 
     @param endTimestamp:  timestamp of the last graph 
     @param graph : Graph object representing the graph at the currentTime 
+    @param snapshotStore: SnapshotStore object to record the snapshot in, or None to make a copy of the graph (see calculateSnapshotForTS)
     @returns Graph object of the graph of either the time the next event takes place (collaboration or work) or currentTime+timeSliceUnit from now if there is no event in that timespan 
              updated time: either the timestamp of the next event or currentTime+timeSliceUnit from now if there is no event in that timespan
     """
-    def makeNewSnapshot(self,currentTime,timeSliceUnit,endTimestamp,graph):
+    def makeNewSnapshot(self,currentTime,timeSliceUnit,endTimestamp,graph,snapshotStore = None):
         #search next event timestamp
         #if this timestamp falls before currentTime + timeSliceUnit then a graph is created for this event's timestamp
         #next event within timeframe ]currentTime, currentTime + timeSliceUnit]
@@ -172,15 +224,9 @@ class GraphEvolutionParser:
         if nextSliceTimestamp > endTimestamp:
             nextSliceTimestamp = endTimestamp
 
-        #search collaboration events
-        nextTimestamp = self.searchNextInteractionTimestampWithinTimeFrame(currentTime,nextSliceTimestamp)
-        #could also be an event concerning a node (example: node appearing)
-        nextNodeEventTimestamp = self.searchNextNodeEventWithinTimeFrame(currentTime,nextSliceTimestamp)
-        #could also be an event on the disappearance of an edge
-        nextEdgeRemovalTimestamp = self.searchNextEdgeRemovalTimestampWithinTimeFrame(currentTime,nextSliceTimestamp)
-
-        #select the relevant next timestamp from the 3 options
-        nextTimestamp = self.selectFirstEventTimestampOutOfThree(nextTimestamp,nextNodeEventTimestamp,nextEdgeRemovalTimestamp)
+        #the scheduler holds the collaboration events, the events concerning a node (example: node appearing) and the events on the disappearance of an edge
+        #it returns the first of these within the timeframe
+        nextTimestamp = self.eventScheduler.searchNextEventTimestamp(currentTime,nextSliceTimestamp)
 
         #there is an event in the next
         if nextTimestamp is None:
@@ -188,140 +234,31 @@ class GraphEvolutionParser:
             #NOTE: if you only want graph snapshots for events, not for time slices: leave this as a comment
             #NOTE:  if you want to work with time increments then uncomment this and comment #snapshot = None
             nextTimestamp = nextSliceTimestamp
-            #snapshot = self.calculateSnapshotForTS(graph,nextSliceTimestamp)
+            #snapshot = self.calculateSnapshotForTS(graph,nextSliceTimestamp,snapshotStore)
             snapshot = None
 
         else:
             #calculate for the next event on nextTimestamp
-            snapshot = self.calculateSnapshotForTS(graph,nextTimestamp)
+            snapshot = self.calculateSnapshotForTS(graph,nextTimestamp,snapshotStore)
 
         return snapshot,nextTimestamp
 
-    """
-        Search the dictionary with edge removal times to find whether one takes place between ] beginTS, endTS]
-        @param beginTS datetime object of first timestamp of window
-        @param endTS datetime object of last timestamp of window 
-        @returns the timestamp of the first event within the window
-    """
-    def searchNextEdgeRemovalTimestampWithinTimeFrame(self,beginTS, endTS):
-        # firstTS between ]beginTS, endTS]
-        #dict is unordered, make it into an ordered list
-        orderedTimes = []
-        for edge, time in self.edgeRemovalTimes.items():
-            if beginTS < time and time <= endTS:
-                orderedTimes.append(time)
-        #if there is at least one candidate in the window
-        if orderedTimes:
-            orderedTimes.sort()
-            return orderedTimes[0]
-
-        return None
-
-
-
-
-
-    """
-    Search the collaboration events list to find whether a collaboration events takes place between ] beginTS, endTS]
-    @param beginTS datetime object of first timestamp of window
-    @param endTS datetime object of last timestamp of window 
-    @returns the timestamp of the first event within the window
-    """
-    def searchNextInteractionTimestampWithinTimeFrame(self,beginTS, endTS):
-
-        #firstTS between ]beginTS, endTS]
-        nextTS = None
-        #collabEvents are ordered
-        for ce in self.collabEvents:
-            ts = ce.getEventTimestamp()
-            if ts > endTS:
-                return nextTS
-            elif beginTS < ts:
-                return ts
-
-        return nextTS
-
-    """
-    Search the resourcePopUpTime list to find whether a relevant node pop up event takes place between ] beginTS, endTS]
-    @param beginTS datetime object of first timestamp of window
-    @param endTS datetime object of last timestamp of window 
-    @returns the first timestamp  within the window and None if there is none 
-    """
-    def searchNextNodeEventWithinTimeFrame(self, beginTS, endTS):
-        #firstTS between ]beginTS, endTS]
-        #resourcePopUp is an unordered dict, so make it a list and order it
-        orderedTimes = []
-        #the event represents node popup
-        for key, time in self.resourcePopUpTime.items():
-            if beginTS < time and time <= endTS:
-                orderedTimes.append(time)
-        # if there is at least one candidate in the window
-        if orderedTimes:
-            orderedTimes.sort()
-            return orderedTimes[0]
-
-        return None
-
-
-
-    """
-        @param firstTS: datetime object or None
-        @param secondTS: datetime object or None
-        @param thirdTS: datetime object or None
-        @return first timestamp or none
-    """
-    def selectFirstEventTimestampOutOfThree(self,firstTS,secondTS, thirdTS):
-        # if all three are timestamps
-        if firstTS and secondTS and thirdTS:
-            resultingTS = min(firstTS,secondTS,thirdTS)
-        #if one of the three is at least none, we can pass this on to the function with 2
-        else:
-            if not firstTS:
-                resultingTS = self.selectFirstEventTimestamp(secondTS,thirdTS)
-            elif not secondTS:
-                resultingTS = self.selectFirstEventTimestamp(firstTS,thirdTS)
-            else:
-                resultingTS = self.selectFirstEventTimestamp(firstTS,secondTS)
-
-        return resultingTS
-
-    """
-    @param firstTS: datetime object or None
-    @param secondTS: datetime object or None
-    @return first timestamp or none
-    """
-    def selectFirstEventTimestamp(self,firstTS,secondTS):
-        #if they are both datetime object, return the earliest time
-        #if they are exactly the same it doesn't matter which one we return
-        if firstTS and secondTS:
-            if firstTS < secondTS:
-                return firstTS
-            else:
-                return secondTS
-        #Else one of the two is None
-        elif firstTS:
-            return firstTS
-        elif secondTS:
-            return secondTS
-        #or both are None
-        else:
-            return None
-
-
-
-
-
     """
     Update the graph to represent the graph at the next timestamp:
     Update the existing tie strengths (decay + if an event happens increase the strength) 
     Look for new ties 
     @param graph: current graph as a  Graph object 
     @param timestamp:  timestamp for the new representation of the graph 
+    @param snapshotStore: if None, a copy of graph is updated
+            otherwise graph itself is updated and the changes are recorded in this SnapshotStore object
     @returns graph object representing the new graph at timestamp 
     """
-    def calculateSnapshotForTS(self,graph,timestamp):
+    def calculateSnapshotForTS(self,graph,timestamp,snapshotStore = None):
         #handle existing edges: update based on decay function up until this point
-        newGraph = graph.deepCopy()
+        if snapshotStore is None:
+            newGraph = graph.deepCopy()
+        else:
+            newGraph = graph
         #in this newGraph we can alter the edge weights
         #No events take place between the current graph and the next timestamp : if there is an event the first one happens at timestamp !
         #so no event handling of edges is necessary here
@@ -330,11 +267,13 @@ class GraphEvolutionParser:
         #find all node events that take place on the timestamp
         #First we have the appearance of new resources (their first work event or collab event (whichever is first) takes place at timestamp)
         popupResources = self.findNodeEventsAtTimestamp(timestamp)
+        numberOfNodes = len(newGraph.nodes)
         newGraph.handleNodeEvents(popupResources)
 
         #update strength if interaction takes place
         #find all interactions that take place on the timestamp : returns array of collaboration events
         interactions = self.findInteractionsAtTimestamp(timestamp)
+        numberOfEdges = len(newGraph.edges)
         #update also when the last event on an edge took place and its weight
         newGraph.handleInteractions(interactions,self.tieStrengthHandler, self.lastEventOnEdge,timestamp)
 
@@ -346,6 +285,11 @@ class GraphEvolutionParser:
         # update edge removal timestamps which are the times we need to take additional snapshots
         self.updateRemovalSnapshotTimes(removedEdges, interactions, newGraph)
 
+        if snapshotStore is not None:
+            return snapshotStore.recordSnapshot(newGraph, popupResources, removedEdges, interactions, self.lastEventOnEdge)
+
+        #new nodes and edges are appended to the lists, so the community detection can update its graph with only the changes
+        newGraph.setChanges(graph, newGraph.nodes[numberOfNodes:], removedEdges, newGraph.edges[numberOfEdges:])
         return newGraph
 
 
@@ -356,7 +300,7 @@ class GraphEvolutionParser:
     def findInteractionsAtTimestamp(self,TS):
         #There can be multiple collab events at the same timestamp but between different resources
         #For each resource pair there can be only one event at a certain timestamp
-        collabEventsAtTS = [x for x in self.collabEvents if x.getEventTimestamp() == TS]
+        collabEventsAtTS = [self.eventStore.getCollabEvent(i) for i in self.eventStore.getEventIndicesAtTimestamp(TS)]
         return collabEventsAtTS
 
     """
@@ -364,30 +308,101 @@ class GraphEvolutionParser:
     @return list of Resources that experience a pop up event: they are new to the graph and should be added 
     """
     def findNodeEventsAtTimestamp(self,TS):
-        popupResources = [r for r,timestamp in self.resourcePopUpTime.items() if timestamp == TS]
+        popupResources = list(self.popupResourcesByTimestamp.get(TS, []))
         return popupResources
 
 
+    def getPairEventIndex(self):
+        if self.pairEventIndex is None:
+            self.pairEventIndex = PairEventIndex.PairEventIndex(self.eventStore, self.tieStrengthHandler)
+        return self.pairEventIndex
+
+    """
+    Tie strength between two resources at any point in time, without creating the snapshots up to that point
+    The weight is the one a snapshot at timestamp would have if the temporal graph starts before the first collaboration event
+    @param resourceA: Resource object
+    @param resourceB: Resource object
+    @param timestamp: datetime object
+    @return the weight of the edge between the two resources, 0 if there is no edge at timestamp
+    """
+    def weightAt(self, resourceA, resourceB, timestamp):
+        return self.getPairEventIndex().weightAt(resourceA, resourceB, timestamp)
+
+    """
+    The graph at any point in time, without creating the snapshots up to that point
+    This is the graph of a snapshot at timestamp if the temporal graph starts before the first collaboration event, 
+    with the nodes and edges in the same order
+    @param timestamp: datetime object
+    @return Graph object representing the graph at timestamp
+    """
+    def graphAt(self, timestamp):
+        #nodes: the resources that have appeared, in the order in which they are added to the snapshots
+        nodes = [Node.Node(resource) for resource, popUpTime in self.resourcePopUpTime.items() if popUpTime <= timestamp]
+        nodeMap = {node.getResource(): node for node in nodes}
+
+        #edges: in the order in which they were created, between the resources of the event that created them
+        creationEvents, weights = self.getPairEventIndex().getEdgesAt(timestamp)
+        edgeWeights = {}
+        for eventIndex, weight in zip(creationEvents.tolist(), weights.tolist()):
+            resource1, resource2 = self.eventStore.getResourcePair(eventIndex)
+            edgeWeights[Edge.Edge(nodeMap[resource1], nodeMap[resource2])] = weight
+
+        return Graph.Graph(nodes, list(edgeWeights), edgeWeights, timestamp)
+
+
     """
     Enhance the temporal graph with information about the teams of nodes 
     Each graph object in the snapshot list will be analyzed and info will be added about the team 
-    Added to each graph object: a networkx graph representing the graph, the communities 
+    Added to each graph object: the communities 
     @param temporalGraph: a temporalgraph object with graph snapshots 
+    @param tolerance: the communities of a snapshot are not detected again if no node or edge was added or removed and no edge weight changed more than this, None to detect the communities of every snapshot 
+    @param numberOfProcesses: None to detect the communities in this process, otherwise the connected components of each snapshot are analyzed separately, the large ones by this number of worker processes 
     @return return nothing but alters the temporalGraph object directly 
     """
-    def detectTemporalTeams(self,temporalGraph):
+    def detectTemporalTeams(self,temporalGraph, tolerance = None, numberOfProcesses = None):
         graphSnapshots = temporalGraph.getListOfGraphs()
-        previousCommunities = None
-        for snapshot in graphSnapshots:
-            netwxGraph = snapshot.createNetworkxGraph()
-            ### community detection: pass the communities of the previous snapshot; if no previous snapshot pass None
-            # new nodes do not belong to a community yet and need to be added as a separate community
-            previousCommunities = CommunityDetection.processPreviousCommunityState(netwxGraph.nodes(), previousCommunities)
-            communities = CommunityDetection.communityDetection(netwxGraph, previousCommunities)
-            previousCommunities = communities.copy()
+        for snapshot in self.detectTeamsInStream(graphSnapshots, tolerance, numberOfProcesses):
+            #the teams are added to the snapshots themselves
+            pass
 
+    """
+    Enhance the temporal graph with information about the teams of nodes, detected jointly over windows of consecutive snapshots
+    Instead of passing the communities from one snapshot to the next, the snapshots of a window are analyzed together, and the windows in parallel
+    @param temporalGraph: a temporalgraph object with graph snapshots 
+    @param windowSize: number of consecutive snapshots that are analyzed together 
+    @param numberOfProcesses: number of worker processes, None to analyze the windows in this process 
+    @return return nothing but alters the temporalGraph object directly 
+    """
+    def detectTemporalTeamsInWindows(self, temporalGraph, windowSize, numberOfProcesses = None):
+        graphSnapshots = temporalGraph.getListOfGraphs()
+        partitions = CommunityDetection.detectTemporalCommunities(graphSnapshots, windowSize, numberOfProcesses)
+        for snapshot, communities in zip(graphSnapshots, partitions):
             snapshot.setTeams(communities)
 
+    """
+    Detect the teams one snapshot at a time, only the communities of the previous snapshot are kept 
+    @param graphSnapshots: iterable of Graph objects ordered in time, for example the generator of createTemporalGraph with lazy = True 
+    @param tolerance: see detectTemporalTeams
+    @param numberOfProcesses: see detectTemporalTeams
+    @return generator of the same Graph objects, with their teams added 
+    """
+    def detectTeamsInStream(self, graphSnapshots, tolerance = None, numberOfProcesses = None):
+        ### community detection: the engine keeps the communities of the previous snapshot
+        communityEngine = CommunityDetection.createCommunityEngine(tolerance, numberOfProcesses)
+        numberOfSnapshots = 0
+        try:
+            for snapshot in graphSnapshots:
+                communities = communityEngine.detectCommunities(snapshot)
+                numberOfSnapshots += 1
+
+                snapshot.setTeams(communities)
+                yield snapshot
+        finally:
+            communityEngine.close()
+
+        if tolerance is not None:
+            print("Community detection skipped for " + str(communityEngine.getNumberOfSkippedSnapshots()) + " of " + str(numberOfSnapshots) + " snapshots")
+
 
     """
     Update the list of snapshots on edge removal: 
@@ -402,7 +417,7 @@ class GraphEvolutionParser:
 
         #remove edges that do not exist anymore
         for edge in removedEdges:
-            del self.edgeRemovalTimes[edge]
+            self.eventScheduler.cancelEdgeRemoval(edge)
 
         currentTS = graph.getCurrentWeightsTimestamp()
         #update the times for the edges on which an interaction happens
@@ -418,8 +433,8 @@ class GraphEvolutionParser:
 
             newTS = self.tieStrengthHandler.getPredictedTSofDecay(graph.findEdgeWeight(edge),currentTS)
 
-            #update this in the dict
-            self.edgeRemovalTimes[edge] = newTS
+            #update this in the dict and schedule the removal
+            self.eventScheduler.scheduleEdgeRemoval(edge, newTS)
 
 
 
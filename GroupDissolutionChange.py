@@ -25,7 +25,7 @@ class GroupDissolutionChange(MembershipChange.MembershipChange):
 
             if previousSnapshot:
                 # compare wih the previous snapshot
-                self.compareSnapshots(previousSnapshot, graph, temporalGraph.getGraphTeamMatches(graph))
+                self.membershipChanges.extend(self.compareSnapshots(previousSnapshot, graph, temporalGraph.getGraphTeamMatches(graph)))
 
             previousSnapshot = graph
 
@@ -37,9 +37,11 @@ class GroupDissolutionChange(MembershipChange.MembershipChange):
     @param previousGraph : Graph object representing the previous snapshot
     @param graph : Graph object representing the current snapshot 
     @param teamMatches:  list of tuples containing a set of nodes that form a group in the previous snapshot, and a set of node IDs that form a group in this graph 
+    @return list of the changes found between the two snapshots
     """
 
     def compareSnapshots(self, previousGraph, graph, teamMatches):
+        changes = []
         for match in teamMatches:
             oldTeam = match[0]
             newTeam = match[1]
@@ -55,7 +57,7 @@ class GroupDissolutionChange(MembershipChange.MembershipChange):
                             #only one original member left, we consider this to be group dissolution
                             #optional: search in which teams the original members now reside
                             destinationTeams = self.getTeamsForResources(oldTeam, teamMatches)
-                            self.membershipChanges.append(dict({"timestamp": graph.getTimestamp(), "originalGroup": oldTeam,
+                            changes.append(dict({"timestamp": graph.getTimestamp(), "originalGroup": oldTeam,
                                              "destinationTeams": destinationTeams}))
 
                 else:
@@ -66,9 +68,19 @@ class GroupDissolutionChange(MembershipChange.MembershipChange):
                         groupMerged = self.testGroupMerge(oldTeam,teamMatches)
                         if not groupMerged:
                             destinationTeams = self.getTeamsForResources(oldTeam, teamMatches)
-                            self.membershipChanges.append(dict({"timestamp": graph.getTimestamp(), "originalGroup": oldTeam,
+                            changes.append(dict({"timestamp": graph.getTimestamp(), "originalGroup": oldTeam,
                                                             "destinationTeams": destinationTeams}))
 
+        return changes
+
+    """
+    Detect the changes between two consecutive snapshots, used when the snapshots are processed one at a time
+    @return list of the changes found between the two snapshots
+    """
+    def detectChangesBetweenSnapshots(self, previousGraph, graph, teamMatches, expansionChanges, expulsionChanges):
+        return self.compareSnapshots(previousGraph, graph, teamMatches)
+
+
     """
     Test if the team moved in its entirety to another team 
     @param team : set of resource IDs that make up a team 
@@ -25,7 +25,7 @@ class GroupMergeChange(MembershipChange.MembershipChange):
 
             if previousSnapshot:
                 # compare wih the previous snapshot
-                self.compareSnapshots(previousSnapshot, graph, temporalGraph.getGraphTeamMatches(graph))
+                self.membershipChanges.extend(self.compareSnapshots(previousSnapshot, graph, temporalGraph.getGraphTeamMatches(graph)))
 
             previousSnapshot = graph
 
@@ -37,9 +37,11 @@ class GroupMergeChange(MembershipChange.MembershipChange):
     @param previousGraph : Graph object representing the previous snapshot
     @param graph : Graph object representing the current snapshot 
     @param teamMatches:  list of tuples containing a set of nodes that form a group in the previous snapshot, and a set of node IDs that form a group in this graph 
+    @return list of the changes found between the two snapshots
     """
 
     def compareSnapshots(self, previousGraph, graph, teamMatches):
+        changes = []
         for match in teamMatches:
             oldTeam = match[0]
             newTeam = match[1]
@@ -54,13 +56,17 @@ class GroupMergeChange(MembershipChange.MembershipChange):
                         #can oldTeam be None? No since it then would have matched with the team that is merged
                         #currently there is the restriction that the group with who the team merged must also still be in its entirety
                         if mergedGroup[0] and mergedGroup[0].issubset(mergedGroup[1]):
-                            self.membershipChanges.append(dict({"timestamp": graph.getTimestamp(), "originalGroup": oldTeam,
+                            changes.append(dict({"timestamp": graph.getTimestamp(), "originalGroup": oldTeam,
                                                             "mergedWith": mergedGroup[0],"resultingGroup":mergedGroup[1]}))
 
+        return changes
 
-
-
-
+    """
+    Detect the changes between two consecutive snapshots, used when the snapshots are processed one at a time
+    @return list of the changes found between the two snapshots
+    """
+    def detectChangesBetweenSnapshots(self, previousGraph, graph, teamMatches, expansionChanges, expulsionChanges):
+        return self.compareSnapshots(previousGraph, graph, teamMatches)
 
 
     """
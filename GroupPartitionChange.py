@@ -25,7 +25,7 @@ class GroupPartitionChange(MembershipChange.MembershipChange):
 
             if previousSnapshot:
                 # compare wih the previous snapshot
-                self.compareSnapshots(previousSnapshot, graph, temporalGraph.getGraphTeamMatches(graph))
+                self.membershipChanges.extend(self.compareSnapshots(previousSnapshot, graph, temporalGraph.getGraphTeamMatches(graph)))
 
             previousSnapshot = graph
 
@@ -37,9 +37,11 @@ class GroupPartitionChange(MembershipChange.MembershipChange):
     @param previousGraph : Graph object representing the previous snapshot
     @param graph : Graph object representing the current snapshot 
     @param teamMatches:  list of tuples containing a set of nodes that form a group in the previous snapshot, and a set of node IDs that form a group in this graph 
+    @return list of the changes found between the two snapshots
     """
 
     def compareSnapshots(self, previousGraph, graph, teamMatches):
+        changes = []
         for match in teamMatches:
             oldTeam = match[0]
             newTeam = match[1]
@@ -52,14 +54,17 @@ class GroupPartitionChange(MembershipChange.MembershipChange):
                     if originalTeam:
 
                         # Currently there is a restriction on only PURE splits meaning each part of the original group is a seperate group without new expansions etc.
-                        self.membershipChanges.append(dict({"timestamp": graph.getTimestamp(), "originalGroup": originalTeam,
+                        changes.append(dict({"timestamp": graph.getTimestamp(), "originalGroup": originalTeam,
                                                             "splitInto": partedGroup}))
 
+        return changes
 
-
-
-
-
+    """
+    Detect the changes between two consecutive snapshots, used when the snapshots are processed one at a time
+    @return list of the changes found between the two snapshots
+    """
+    def detectChangesBetweenSnapshots(self, previousGraph, graph, teamMatches, expansionChanges, expulsionChanges):
+        return self.compareSnapshots(previousGraph, graph, teamMatches)
 
 
     """
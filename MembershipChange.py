@@ -12,6 +12,39 @@ class MembershipChange():
    def detectChanges(self,temporalGraph, expansionChangeMiner, expulsionChangeMiner):
         pass
 
+   """
+   This function is overridden in each of the child classes, it is used when the snapshots are processed one at a time (see MembershipChangeMonitor.detectMembershipChangesInStream)
+   @param previousGraph  Graph object representing the previous snapshot
+   @param graph  Graph object representing the current snapshot
+   @param teamMatches  list of tuples containing a set of nodes that form a group in the previous snapshot, and a set of node IDs that form a group in this graph
+   @param expansionChanges  list of expansion changes found between these two snapshots
+   @param expulsionChanges  list of expulsion changes found between these two snapshots
+   @return the changes found between these two snapshots, in the same format as detectChanges
+   """
+   def detectChangesBetweenSnapshots(self, previousGraph, graph, teamMatches, expansionChanges, expulsionChanges):
+        pass
+
+   """
+   Used when all snapshots are processed in a single pass (see MembershipChangeMonitor.detectMembershipChanges)
+   @return True if the changes between two consecutive snapshots (detectChangesBetweenSnapshots) are the changes that detectChanges finds for them,
+           False if this type of change needs all snapshots and is detected with detectChanges after the pass
+   """
+   def isDetectedPerSnapshot(self):
+        return True
+
+   """
+   Add the changes found between two snapshots to the changes found so far
+   @param changes  the changes found by detectChangesBetweenSnapshots
+   """
+   def addDetectedChanges(self, changes):
+        self.membershipChanges.extend(changes)
+
+   """
+   @return the changes added with addDetectedChanges, in the same format as detectChanges
+   """
+   def getDetectedChanges(self):
+        return self.membershipChanges
+
    def printDetectedChanges(self, listOfChanges):
        pass
 
@@ -16,14 +16,20 @@ class MembershipChangeMonitor:
 
     """
     @param temporalGraph an object of class TemporalGraph that represents a temporal graph with different snapshots
+            or None if the snapshots are processed one at a time with detectMembershipChangesInStream
+    @param matchingMethod how the teams are matched between snapshots: TeamMatcher.GREEDY, TeamMatcher.OVERLAP or TeamMatcher.JACCARD
+    @param numberOfProcesses None to match the teams in this process, otherwise the number of worker processes that match the pairs of snapshots in parallel
     """
-    def __init__(self, temporalGraph):
+    def __init__(self, temporalGraph = None, matchingMethod = TeamMatcher.GREEDY, numberOfProcesses = None):
         self.temporalGraph = temporalGraph
+        self.matchingMethod = matchingMethod
+        self.numberOfProcesses = numberOfProcesses
         self.expansionChangeMiner = None
         self.expulsionChangeMiner = None
 
         #match teams between snapshots
-        self.matchTeams()
+        if temporalGraph is not None:
+            self.matchTeams()
 
 
         #dictionary with membership changes: type of change is key, value is another dictionary with the relevant details
@@ -57,9 +63,41 @@ class MembershipChangeMonitor:
 
 
     """
-    
+    Detect all enabled changes in a single pass over the snapshots: each pair of consecutive snapshots and their team matches is handed to every type of change 
+    The types of change that need all snapshots (reassignment) are detected after the pass, from the expansion and expulsion changes found in the pass 
+    The changes are the same as those of detectMembershipChangesPerType 
     """
     def detectMembershipChanges(self):
+        print("Detecting membership changes")
+        typesPerSnapshot = [typeOfChange for typeOfChange in self.membershipChanges if typeOfChange.isDetectedPerSnapshot()]
+
+        previousSnapshot = None
+        for graph in self.temporalGraph.getListOfGraphs():
+            if previousSnapshot:
+                teamMatches = self.temporalGraph.getGraphTeamMatches(graph)
+                #the expansion and expulsion changes are detected first, some changes build upon them
+                expansionChanges = []
+                expulsionChanges = []
+                for typeOfChange in typesPerSnapshot:
+                    changes = typeOfChange.detectChangesBetweenSnapshots(previousSnapshot, graph, teamMatches, expansionChanges, expulsionChanges)
+                    if typeOfChange is self.expansionChangeMiner:
+                        expansionChanges = changes
+                    elif typeOfChange is self.expulsionChangeMiner:
+                        expulsionChanges = changes
+                    typeOfChange.addDetectedChanges(changes)
+
+            previousSnapshot = graph
+
+        for typeOfChange in self.membershipChanges:
+            if typeOfChange.isDetectedPerSnapshot():
+                self.membershipChanges[typeOfChange] = typeOfChange.getDetectedChanges()
+            else:
+                self.membershipChanges[typeOfChange] = typeOfChange.detectChanges(self.temporalGraph, self.expansionChangeMiner, self.expulsionChangeMiner)
+
+    """
+    Detect the enabled changes one type of change after the other, each type goes over all snapshots 
+    """
+    def detectMembershipChangesPerType(self):
         #detect all enabled changes
         for key in self.membershipChanges:
             #some changes build upon the expansion and expulsion changes already found
@@ -67,6 +105,30 @@ class MembershipChangeMonitor:
             self.membershipChanges[key] = detectedChanges
 
 
+    """
+    Detect the changes one snapshot at a time, while the snapshots are being created 
+    Only the previous snapshot is kept (and for reassignment changes the snapshots within its time window), the detected changes are not kept 
+    @param matchedSnapshots iterable of tuples (Graph object, team matches with the previous snapshot) ordered in time, see TeamMatcher.matchTeamsInStream 
+    @return generator of tuples (object of the type of change, the changes of that type found in a snapshot), the changes in the same format as detectChanges 
+    """
+    def detectMembershipChangesInStream(self, matchedSnapshots):
+        previousSnapshot = None
+        for graph, teamMatches in matchedSnapshots:
+            if previousSnapshot:
+                #the expansion and expulsion changes are detected first, some changes build upon them
+                expansionChanges = []
+                expulsionChanges = []
+                for typeOfChange in self.membershipChanges:
+                    changes = typeOfChange.detectChangesBetweenSnapshots(previousSnapshot, graph, teamMatches, expansionChanges, expulsionChanges)
+                    if typeOfChange is self.expansionChangeMiner:
+                        expansionChanges = changes
+                    elif typeOfChange is self.expulsionChangeMiner:
+                        expulsionChanges = changes
+                    if changes:
+                        yield typeOfChange, changes
+
+            previousSnapshot = graph
+
     """
     Print all the detected changes in the console 
     """
@@ -95,17 +157,18 @@ class MembershipChangeMonitor:
 
     def matchTeams(self):
         graphSnapshots = self.temporalGraph.getListOfGraphs()
-        previousSnapshot = None
-        for graph in graphSnapshots:
+        if self.numberOfProcesses is not None:
+            #the first snapshot has no previous snapshot to match with
+            for graph, teamMatches in zip(graphSnapshots[1:], TeamMatcher.matchTeamsInParallel(graphSnapshots, self.matchingMethod, self.numberOfProcesses)):
+                self.temporalGraph.appendGraphTeamMatch(graph,teamMatches)
+            return
 
-            if previousSnapshot:
-                # compare wih the previous snapshot to match the teams
-                teamMatches = TeamMatcher.matchTeamsBetweenSnapshots(previousSnapshot, graph)
+        for graph, teamMatches in TeamMatcher.matchTeamsInStream(graphSnapshots, self.matchingMethod):
+            #the first snapshot has no previous snapshot to match with
+            if teamMatches is not None:
                 #add to the temporal graph
                 self.temporalGraph.appendGraphTeamMatch(graph,teamMatches)
 
-            previousSnapshot = graph
-
 
 
 
@@ -0,0 +1,131 @@
+#Index of the collaboration events per pair of resources, to query tie strengths at any point in time
+#With the tie decay function, the weight of an edge at time t only depends on the last event on the edge before t and the weight at that event
+#The weight at each event is calculated once for all events, after that a query is a binary search and one evaluation of the decay function
+import numpy as np
+
+import EventStore
+
+
+class PairEventIndex:
+
+    """
+    The weights follow the same steps as GraphEvolutionParser.createTemporalGraph when it starts before the first event:
+    at an event the edge weight is decayed up to the event, the edge disappears if the decayed weight is below the threshold,
+    and the interaction increases the weight (starting from 0 if the edge disappeared)
+    @param eventStore: EventStore object holding the collaboration events ordered in time
+    @param tieStrengthHandler: TieStrengthHandler object that holds all mechanisms of tie decay and evolution
+    """
+    def __init__(self, eventStore, tieStrengthHandler):
+        self.eventStore = eventStore
+        self.tieStrengthHandler = tieStrengthHandler
+
+        #a pair of resources is identified by the key lowest index * number of resources + highest index
+        self.numberOfResources = len(eventStore.getResources())
+        self.resourceIndex = {resource: i for i, resource in enumerate(eventStore.getResources())}
+        sources = eventStore.getSources().astype(np.int64)
+        targets = eventStore.getTargets().astype(np.int64)
+        pairKeys = np.minimum(sources, targets) * self.numberOfResources + np.maximum(sources, targets)
+
+        #the events of a pair are a contiguous range, ordered in time (the events in the store are ordered in time and the sort is stable)
+        #index of the event in the event store for each position
+        self.eventIndices = np.argsort(pairKeys, kind="stable")
+        sortedKeys = pairKeys[self.eventIndices]
+        starts = np.flatnonzero(np.r_[True, sortedKeys[1:] != sortedKeys[:-1]]) if len(sortedKeys) else np.zeros(0, dtype=np.int64)
+        #the events of pair p are at positions pairOffsets[p]:pairOffsets[p+1]
+        self.pairOffsets = np.append(starts, len(sortedKeys))
+        #dict with the pair key as key and the index of the pair as value
+        self.pairs = dict(zip(sortedKeys[starts].tolist(), range(len(starts))))
+
+        #event timestamps in microseconds since EventStore.EPOCH
+        self.times = eventStore.getTimestamps()[self.eventIndices] * 10**6
+        #edge weight right after each event
+        self.weights = np.empty(len(sortedKeys), dtype=np.float64)
+        #index in the event store of the event that created the edge, for each event
+        self.creationEvents = np.empty(len(sortedKeys), dtype=np.int64)
+        self.__calculateEventWeights()
+
+    """
+    The weight at an event depends on the weight at the previous event of the same pair
+    All pairs are handled at once: in round k the k-th event of every pair with more than k events is calculated
+    """
+    def __calculateEventWeights(self):
+        if not len(self.times):
+            return
+        first = self.pairOffsets[:-1]
+        numberOfEvents = np.diff(self.pairOffsets)
+        threshold = self.tieStrengthHandler.getWeightCutoffThreshold()
+
+        #the first event of a pair creates the edge
+        self.weights[first] = self.tieStrengthHandler.handleInteractionBatch(np.zeros(len(first)))
+        self.creationEvents[first] = self.eventIndices[first]
+
+        for k in range(1, numberOfEvents.max()):
+            positions = first[numberOfEvents > k] + k
+            numberOfTimeSteps = self.tieStrengthHandler.calculateNumberOfTimeStepsBatch(self.times[positions] - self.times[positions - 1])
+            decayedWeights = self.tieStrengthHandler.decayEdgeWeightBatch(self.weights[positions - 1], numberOfTimeSteps)
+
+            #if the edge disappeared before this event, the interaction creates a new edge
+            survives = decayedWeights >= threshold
+            self.weights[positions] = self.tieStrengthHandler.handleInteractionBatch(np.where(survives, decayedWeights, 0))
+            self.creationEvents[positions] = np.where(survives, self.creationEvents[positions - 1], self.eventIndices[positions])
+
+    """
+    @param resourceA: Resource object
+    @param resourceB: Resource object
+    @param timestamp: datetime object
+    @return the weight of the edge between the two resources at timestamp, 0 if there is no edge
+    """
+    def weightAt(self, resourceA, resourceB, timestamp):
+        pair = self.__findPair(resourceA, resourceB)
+        if pair is None:
+            return 0
+
+        start, end = self.pairOffsets[pair], self.pairOffsets[pair + 1]
+        microseconds = EventStore.toEpochMicroseconds(timestamp)
+        #last event at or before timestamp
+        last = start + int(np.searchsorted(self.times[start:end], microseconds, side="right")) - 1
+        if last < start:
+            return 0
+
+        weight = float(self.__decayedWeights(np.array([last]), microseconds)[0])
+        if weight < self.tieStrengthHandler.getWeightCutoffThreshold():
+            return 0
+        return weight
+
+    """
+    @param timestamp: datetime object
+    @return tuple (array with the index in the event store of the event that created each edge, array with the weight of each edge)
+            for the edges that exist at timestamp, ordered in the order in which the edges were created
+    """
+    def getEdgesAt(self, timestamp):
+        if not len(self.times):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+        microseconds = EventStore.toEpochMicroseconds(timestamp)
+
+        #the events of a pair at or before timestamp are the first ones of its range
+        numberOfPastEvents = np.add.reduceat((self.times <= microseconds).astype(np.int64), self.pairOffsets[:-1])
+        hasPast = numberOfPastEvents > 0
+        last = self.pairOffsets[:-1][hasPast] + numberOfPastEvents[hasPast] - 1
+
+        weights = self.__decayedWeights(last, microseconds)
+        exists = weights >= self.tieStrengthHandler.getWeightCutoffThreshold()
+        creationEvents = self.creationEvents[last[exists]]
+        order = np.argsort(creationEvents, kind="stable")
+        return creationEvents[order], weights[exists][order]
+
+    """
+    @param positions: array of positions of events in this index
+    @param microseconds: timestamp in microseconds since EventStore.EPOCH, not before any of the events
+    @return array with the weights after each event decayed up to the timestamp
+    """
+    def __decayedWeights(self, positions, microseconds):
+        numberOfTimeSteps = self.tieStrengthHandler.calculateNumberOfTimeStepsBatch(microseconds - self.times[positions])
+        return self.tieStrengthHandler.decayEdgeWeightBatch(self.weights[positions], numberOfTimeSteps)
+
+    #@return the index of the pair of resources, or None if they never collaborated
+    def __findPair(self, resourceA, resourceB):
+        a = self.resourceIndex.get(resourceA)
+        b = self.resourceIndex.get(resourceB)
+        if a is None or b is None:
+            return None
+        return self.pairs.get(min(a, b) * self.numberOfResources + max(a, b))
@@ -0,0 +1,103 @@
+#On-disk cache of the parsed input data
+#The parsed resources, objects, collaboration events and work events are stored in an uncompressed .npz file
+#that is keyed on the size, modification time and content hash of the input files
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+import Resource
+import Object
+import WorkEvent
+import EventStore
+
+#increase when the way the input files are turned into events changes, so older cache files are not used anymore
+CACHE_VERSION = 1
+
+
+"""
+@param files: list of file names of the input files, a file name can be None
+@return hexadecimal string that identifies the size, modification time and content of all files
+"""
+def fingerprintFiles(files):
+    fingerprint = hashlib.sha256()
+    fingerprint.update(("version " + str(CACHE_VERSION) + "\n").encode("utf-8"))
+    for file in files:
+        if file is None or not os.path.isfile(file):
+            fingerprint.update(b"no file\n")
+            continue
+        status = os.stat(file)
+        fingerprint.update((str(status.st_size) + " " + str(status.st_mtime_ns) + "\n").encode("utf-8"))
+        with open(file, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                fingerprint.update(block)
+    return fingerprint.hexdigest()
+
+
+"""
+@param cacheDirectory: directory that holds the cache files
+@param files: list of file names of the input files
+@return name of the cache file for these input files
+"""
+def getCacheFileName(cacheDirectory, files):
+    return os.path.join(cacheDirectory, "parse-" + fingerprintFiles(files) + ".npz")
+
+
+"""
+Load the parsed data from the cache
+@param cacheFile: name of the cache file of the input files, see getCacheFileName
+@return tuple (list of Resource objects, list of Object objects, EventStore object with the collaboration events, list of WorkEvent objects)
+        or None if these input files are not in the cache
+"""
+def loadParsedData(cacheFile):
+    if not os.path.isfile(cacheFile):
+        return None
+
+    with np.load(cacheFile, allow_pickle=False) as data:
+        resources = [Resource.Resource(int(id), str(label)) for id, label in zip(data["resourceIDs"], data["resourceLabels"])]
+        objects = [Object.Object(int(id), str(label)) for id, label in zip(data["objectIDs"], data["objectLabels"])]
+        eventStore = EventStore.EventStore(resources, objects, data["timestamps"], data["sources"], data["targets"],
+                                           data["objectOffsets"], data["objectIndices"])
+        workEvents = [WorkEvent.WorkEvent(resources[i], EventStore.fromEpochSeconds(ts)) for i, ts in zip(data["workResources"], data["workTimestamps"])]
+
+    return resources, objects, eventStore, workEvents
+
+
+"""
+Save the parsed data to the cache
+@param cacheFile: name of the cache file of the input files, see getCacheFileName
+@param eventStore: EventStore object with the collaboration events, its resource and object lists are saved as well
+@param workEvents: list of WorkEvent objects
+"""
+def saveParsedData(cacheFile, eventStore, workEvents):
+    cacheDirectory = os.path.dirname(cacheFile) or "."
+    os.makedirs(cacheDirectory, exist_ok=True)
+
+    resources = eventStore.getResources()
+    objects = eventStore.getObjects()
+    resourceIndex = {resource: i for i, resource in enumerate(resources)}
+    workResources = np.array([EventStore.findOrAddIndex(we.getResource(), resourceIndex, resources) for we in workEvents], dtype=np.int32)
+    workTimestamps = np.array([EventStore.toEpochSeconds(we.getEventTimestamp()) for we in workEvents], dtype=np.int64)
+
+    #write to a temporary file first so an interrupted run never leaves a broken cache file behind
+    fileDescriptor, temporaryFile = tempfile.mkstemp(dir=cacheDirectory, suffix=".npz")
+    try:
+        with os.fdopen(fileDescriptor, "wb") as f:
+            np.savez(f,
+                     resourceIDs=np.array([r.getID() for r in resources], dtype=np.int64),
+                     resourceLabels=np.array([r.getLabel() for r in resources], dtype=str),
+                     objectIDs=np.array([o.getID() for o in objects], dtype=np.int64),
+                     objectLabels=np.array([o.getLabel() for o in objects], dtype=str),
+                     timestamps=eventStore.getTimestamps(),
+                     sources=eventStore.getSources(),
+                     targets=eventStore.getTargets(),
+                     objectOffsets=eventStore.getObjectOffsets(),
+                     objectIndices=eventStore.getObjectIndices(),
+                     workResources=workResources,
+                     workTimestamps=workTimestamps)
+        os.replace(temporaryFile, cacheFile)
+    except BaseException:
+        #also on an interrupt: do not leave the temporary file behind in the cache directory
+        os.unlink(temporaryFile)
+        raise
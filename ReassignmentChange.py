@@ -2,6 +2,7 @@
 import copy
 
 import MembershipChange
+import TemporalGraph
 from datetime import datetime, timedelta
 import sys
 import csv
@@ -11,6 +12,14 @@ class ReassingmentChange(MembershipChange.MembershipChange):
 
     def __init__(self):
         self.membershipChanges = []
+        #an expansion change must follow the expulsion change within this window to be a reassignment change
+        self.timewindow = timedelta(days = 3)
+
+        #used when the snapshots are processed one at a time
+        #expulsion changes of which the expansion change within the time window is not found yet
+        self.pendingExpulsions = []
+        #TemporalGraph object with the snapshots and team matches from the oldest pending expulsion change on
+        self.recentSnapshots = TemporalGraph.TemporalGraph(0, [])
 
     """
     Detect reassignment membership change
@@ -45,7 +54,7 @@ class ReassingmentChange(MembershipChange.MembershipChange):
 
 
     def findReassignmentChangesOverMultipleSnapshots(self,temporalGraph,graphSnapshots, expansionChangeMiner, expulsionChangeMiner):
-        timewindow = timedelta(days = 3)
+        timewindow = self.timewindow
         #for each resource that has an expulsion change: search if they also have an expansion change within the timeframe
         expulsions = expulsionChangeMiner.getExpulsionChanges()
         for expulsion in expulsions:
@@ -57,10 +66,50 @@ class ReassingmentChange(MembershipChange.MembershipChange):
 
 
 
+    #an expulsion change is matched with the first expansion change in its time window, which can be in a later snapshot
+    def isDetectedPerSnapshot(self):
+        return False
+
+    """
+    Detect the changes between two consecutive snapshots, used when the snapshots are processed one at a time
+    An expulsion change waits until the first expansion change of the same resource, or until its time window has passed 
+    Only the snapshots from the oldest waiting expulsion change on are kept 
+    @param expansionChanges  list of expansion changes found between these two snapshots
+    @param expulsionChanges  list of expulsion changes found between these two snapshots
+    @return list of the reassignment changes that are found in this snapshot
+    """
+    def detectChangesBetweenSnapshots(self, previousGraph, graph, teamMatches, expansionChanges, expulsionChanges):
+        self.recentSnapshots.appendGraph(graph, teamMatches)
+        self.pendingExpulsions.extend(expulsionChanges)
+
+        numberOfChanges = len(self.membershipChanges)
+        pendingExpulsions = []
+        for expulsion in self.pendingExpulsions:
+            #the time window has passed: there is no expansion change for this expulsion change
+            if graph.getTimestamp() > expulsion["timestamp"] + self.timewindow:
+                continue
+            #the expansion changes of this snapshot are the first ones since the expulsion change
+            expansionChange = next((change for change in expansionChanges if change["resource"] == expulsion["resource"]), None)
+            if expansionChange:
+                self.checkReassignmentEligibility(self.recentSnapshots, self.recentSnapshots.getListOfGraphs(), expulsion, expansionChange)
+            else:
+                pendingExpulsions.append(expulsion)
+        self.pendingExpulsions = pendingExpulsions
+
+        if self.pendingExpulsions:
+            self.recentSnapshots.removeGraphsBefore(min(expulsion["timestamp"] for expulsion in self.pendingExpulsions))
+        else:
+            self.recentSnapshots.removeGraphsBefore(graph.getTimestamp())
+
+        #the changes are handed to the caller and not kept
+        changes = self.membershipChanges[numberOfChanges:]
+        del self.membershipChanges[numberOfChanges:]
+        return changes
+
     """
     Check if a reassignment took place for this expulsion change before (<=) the endTime 
     Explore all snapshots to track the evolution of this resource 
-    @param graphSnapshots  list of Graph object indicating the evolution in the temporal graph 
+    @param graphSnapshots  list of Graph object indicating the evolution in the temporal graph (the snapshots in range are found with the index of temporalGraph)
     @param expulsionChange  dictionary with details on a singular expulsion change 
     @param expansionChange  dictionary with details on a singular expansion change 
     """
@@ -72,7 +121,7 @@ class ReassingmentChange(MembershipChange.MembershipChange):
             snapshots = [beginSnapshot]
         else:
             #first graph is the graph in which the expulsion happens, last one is the one where the expansion happens
-            snapshots = self.getSnapshotsWithinRange(graphSnapshots,beginSnapshot, endSnapshot)
+            snapshots = temporalGraph.getSnapshotsWithinRange(beginSnapshot, endSnapshot)
 
         #test instantaneous reassignment: if instantaneous there should be only one snapshot
         if len(snapshots) == 1:
@@ -86,31 +135,6 @@ class ReassingmentChange(MembershipChange.MembershipChange):
 
 
 
-    """
-    @param graphSnaphots : list of Graph items that are the sequential snapshots (ordered in time) 
-    @param beginSnapshot : Graph object that is the first to include
-    @param endSnapshot : Graph object that is the last to include
-    @return list of graph snapshots that begins with the first Graph object and ends with the last Graph object
-    """
-    def getSnapshotsWithinRange(self,graphSnapshots,beginSnapshot, endSnapshot):
-        inRange = []
-        include = False
-        for graph in graphSnapshots:
-            if graph == beginSnapshot:
-                include = True
-
-            if include :
-                inRange.append(graph)
-
-            if graph == endSnapshot:
-                include = False
-                break
-
-        return inRange
-
-
-
-
     """
     Check instantaneous reassignment : there is only one snapshot: if a reassignment change: add to the membership dictionary
     @param temporalGraph : TemporalGraph object representing the temporal graph
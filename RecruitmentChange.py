@@ -23,12 +23,7 @@ class RecruitmentChange(MembershipChange.MembershipChange):
             #if a new node ID appears between two snapshots, a recruitment event took place
             if previousSnapshot:
                 #compare wih the previous snapshot
-                previousNodes = previousSnapshot.getListOfNodeIDs()
-                currentNodes = graph.getListOfNodeIDs()
-                newNodes = [el for el in currentNodes if el not in previousNodes]
-                #make for each recruitment a change event
-                for newNode in newNodes:
-                    membershipChanges[newNode] = graph.getTimestamp()
+                membershipChanges.update(self.compareSnapshots(previousSnapshot, graph))
 
             #########else:  first snapshot: all nodes are considered to be 'new'
             #but since we don't often start at the beginning but somewhere in the middle of the dataset,
@@ -46,6 +41,35 @@ class RecruitmentChange(MembershipChange.MembershipChange):
 
         return membershipChanges
 
+    """
+    Compare the previous graph snapshot with the current 
+    @param previousGraph : Graph object representing the previous snapshot
+    @param graph : Graph object representing the current snapshot 
+    @return dict with the IDs of the nodes that are new in the current snapshot as keys and the timestamp of the current snapshot as value
+    """
+    def compareSnapshots(self, previousGraph, graph):
+        changes = {}
+        previousNodes = previousGraph.getListOfNodeIDs()
+        currentNodes = graph.getListOfNodeIDs()
+        newNodes = [el for el in currentNodes if el not in previousNodes]
+        #make for each recruitment a change event
+        for newNode in newNodes:
+            changes[newNode] = graph.getTimestamp()
+        return changes
+
+    """
+    Detect the changes between two consecutive snapshots, used when the snapshots are processed one at a time
+    @return dict with node ID and timestamp of the recruitments between the two snapshots
+    """
+    def detectChangesBetweenSnapshots(self, previousGraph, graph, teamMatches, expansionChanges, expulsionChanges):
+        return self.compareSnapshots(previousGraph, graph)
+
+    """
+    @param changes  dict with node ID and timestamp of the recruitments between two snapshots
+    """
+    def addDetectedChanges(self, changes):
+        self.membershipChanges.update(changes)
+
     """
     Print out all recruitment changes in the list 
     @param changes: dictionary with node ID and timestamp 
@@ -0,0 +1,297 @@
+#Delta-encoded storage of the graph snapshots of a temporal graph
+#Instead of a full copy of the graph for every snapshot, only the changes with respect to the previous snapshot are kept:
+#new nodes, removed edges, new edges, and the edges on which an event took place (timestamp and weight of the last event)
+#The edge weights of a snapshot follow from the last event on each edge and the tie decay function, so they are recalculated when the snapshot is rebuilt
+#Every keyframeInterval snapshots a full copy is kept, so any snapshot can be rebuilt from the closest keyframe
+import collections
+
+import numpy as np
+
+import Graph
+import EventStore
+
+
+class SnapshotDelta:
+
+    """
+    @param timestamp: datetime object of the snapshot
+    @param addedNodes: list of Node objects that are added in this snapshot
+    @param removedEdges: list of Edge objects that are removed in this snapshot
+    @param addedEdges: list of Edge objects that are added in this snapshot, in the order in which they were created
+    @param lastEvents: list of tuples (Edge object, weight) of the edges on which an event took place in this snapshot
+    @param weightOverrides: dict with Edge object as key and weight as value for the edges whose weight does not follow from the decay of the last event
+    """
+    def __init__(self, timestamp, addedNodes, removedEdges, addedEdges, lastEvents, weightOverrides):
+        self.timestamp = timestamp
+        self.addedNodes = addedNodes
+        self.removedEdges = removedEdges
+        self.addedEdges = addedEdges
+        self.lastEvents = lastEvents
+        self.weightOverrides = weightOverrides
+
+
+class SnapshotState:
+
+    """
+    Structure of the graph at a snapshot
+    @param index: index of the snapshot
+    @param nodes: list of Node objects
+    @param edges: dict with the Edge objects as keys (ordered as the edge list of the graph) and None as value
+    @param lastEventOnEdge: dict with Edge object as key and the tuple (timestamp of the last event on this edge, weight at that point) as value
+    """
+    def __init__(self, index, nodes, edges, lastEventOnEdge):
+        self.index = index
+        self.nodes = nodes
+        self.edges = edges
+        self.lastEventOnEdge = lastEventOnEdge
+
+    def copy(self):
+        return SnapshotState(self.index, list(self.nodes), dict(self.edges), dict(self.lastEventOnEdge))
+
+    """
+    Apply the changes of the next snapshot
+    @param delta: SnapshotDelta object of the snapshot following this state
+    """
+    def apply(self, delta):
+        self.index += 1
+        self.nodes.extend(delta.addedNodes)
+        for edge in delta.removedEdges:
+            del self.edges[edge]
+            del self.lastEventOnEdge[edge]
+        for edge in delta.addedEdges:
+            self.edges[edge] = None
+        for edge, weight in delta.lastEvents:
+            self.lastEventOnEdge[edge] = (delta.timestamp, weight)
+
+
+class SnapshotStore:
+
+    """
+    @param tieStrengthHandler: object of this class that holds all mechanisms of tie decay and evolution, used to recalculate the edge weights
+    @param keyframeInterval: number of snapshots between two full copies of the graph
+    @param cacheSize: number of rebuilt snapshots that are kept
+    """
+    def __init__(self, tieStrengthHandler, keyframeInterval = 50, cacheSize = 4):
+        self.tieStrengthHandler = tieStrengthHandler
+        self.keyframeInterval = keyframeInterval
+        self.cacheSize = cacheSize
+        #list of SnapshotDelta objects, one for each snapshot
+        self.deltas = []
+        #dict with the snapshot index as key and the SnapshotState object after that snapshot as value
+        self.keyframes = {}
+        #Edge objects in the last recorded snapshot
+        self.liveEdges = set()
+
+        #the last rebuilt snapshots, least recently used first: dict with the snapshot index as key and the tuple (SnapshotState object, Graph object) as value
+        #snapshots are mostly requested in order or in pairs of consecutive snapshots (team matching), so they are rebuilt from these
+        self.rebuiltSnapshots = collections.OrderedDict()
+
+    def getNumberOfSnapshots(self):
+        return len(self.deltas)
+
+    """
+    Record the changes of a new snapshot
+    @param graph: the working Graph object, already updated to the timestamp of the snapshot
+    @param popupResources: list of Resource objects that are added as nodes in this snapshot
+    @param removedEdges: list of Edge objects that are removed in this snapshot
+    @param interactions: list of CollaborationEvent objects that take place in this snapshot
+    @param lastEventOnEdge: dictionary with Edge object as key and the timestamp of the last event on this edge and its weight at that point as values
+    @return StoredSnapshot object representing the snapshot
+    """
+    def recordSnapshot(self, graph, popupResources, removedEdges, interactions, lastEventOnEdge):
+        timestamp = graph.getCurrentWeightsTimestamp()
+        index = len(self.deltas)
+
+        addedNodes = [graph.findNode(resource) for resource in popupResources]
+        for edge in removedEdges:
+            self.liveEdges.discard(edge)
+
+        addedEdges = []
+        lastEvents = []
+        for ce in interactions:
+            resource1, resource2 = ce.getTupleFormat()
+            edge = graph.findEdge(resource1, resource2)
+            if edge not in self.liveEdges:
+                self.liveEdges.add(edge)
+                addedEdges.append(edge)
+            lastEvents.append((edge, lastEventOnEdge[edge][1]))
+
+        #the weight of an edge normally follows from the decay of the weight at its last event; keep the exceptions
+        weightOverrides = {}
+        edges = graph.getEdges()
+        decayedWeights = self.__decayedWeights([lastEventOnEdge[edge] for edge in edges], timestamp)
+        for edge, decayedWeight in zip(edges, decayedWeights):
+            weight = graph.findEdgeWeight(edge)
+            if weight != decayedWeight:
+                weightOverrides[edge] = weight
+
+        self.deltas.append(SnapshotDelta(timestamp, addedNodes, list(removedEdges), addedEdges, lastEvents, weightOverrides))
+
+        if index % self.keyframeInterval == 0:
+            self.keyframes[index] = SnapshotState(index, list(graph.nodes), dict.fromkeys(graph.getEdges()), dict(lastEventOnEdge))
+
+        return StoredSnapshot(self, index, timestamp)
+
+    """
+    Rebuild the graph at a snapshot
+    @param index: index of the snapshot
+    @return Graph object of the snapshot, with its own node and edge lookup structures
+    """
+    def getSnapshot(self, index):
+        if index in self.rebuiltSnapshots:
+            self.rebuiltSnapshots.move_to_end(index)
+            return self.rebuiltSnapshots[index][1]
+
+        #continue from the closest rebuilt snapshot before it if that is closer than the keyframe
+        keyframeIndex = index - index % self.keyframeInterval
+        closerIndices = [rebuiltIndex for rebuiltIndex in self.rebuiltSnapshots if keyframeIndex <= rebuiltIndex < index]
+        if closerIndices:
+            state = self.rebuiltSnapshots[max(closerIndices)][0].copy()
+        else:
+            state = self.keyframes[keyframeIndex].copy()
+        while state.index < index:
+            state.apply(self.deltas[state.index + 1])
+
+        delta = self.deltas[index]
+        edges = list(state.edges)
+        edgeWeights = dict(zip(edges, self.__decayedWeights([state.lastEventOnEdge[edge] for edge in edges], delta.timestamp)))
+        edgeWeights.update(delta.weightOverrides)
+        graph = Graph.Graph(list(state.nodes), edges, edgeWeights, delta.timestamp)
+
+        self.rebuiltSnapshots[index] = (state, graph)
+        if len(self.rebuiltSnapshots) > self.cacheSize:
+            self.rebuiltSnapshots.popitem(last = False)
+        return graph
+
+    """
+    The weights are calculated with the batch decay function, as in Graph.decayEdges
+    @param lastEvents: list of tuples (timestamp of the last event on the edge, weight at that point)
+    @param timestamp: timestamp to calculate the weights for
+    @return list with the weight of each edge at timestamp
+    """
+    def __decayedWeights(self, lastEvents, timestamp):
+        if not lastEvents:
+            return []
+        lastEventTimes = np.array([EventStore.toEpochMicroseconds(lastEventTS) for lastEventTS, lastEventWeight in lastEvents], dtype=np.int64)
+        lastEventWeights = [lastEventWeight for lastEventTS, lastEventWeight in lastEvents]
+        numberOfTimeSteps = self.tieStrengthHandler.calculateNumberOfTimeStepsBatch(EventStore.toEpochMicroseconds(timestamp) - lastEventTimes)
+        decayedWeights = self.tieStrengthHandler.decayEdgeWeightBatch(lastEventWeights, numberOfTimeSteps).tolist()
+        #the event takes place in this snapshot: its weight is the edge weight
+        return [lastEventWeight if lastEventTS == timestamp else decayedWeight
+                for (lastEventTS, lastEventWeight), decayedWeight in zip(lastEvents, decayedWeights)]
+
+
+"""
+Read-only view of a graph snapshot whose nodes, edges, and edge weights are rebuilt from a SnapshotStore when they are needed
+It offers the functions of a Graph object that do not change the graph; the lists and dicts it returns belong to the rebuilt graph and are not kept
+Only the teams are kept by the view itself
+"""
+class StoredSnapshot:
+
+    """
+    @param snapshotStore: SnapshotStore object that holds the changes of the snapshots
+    @param index: index of this snapshot in the store
+    @param timestamp: datetime object of this snapshot
+    """
+    def __init__(self, snapshotStore, index, timestamp):
+        self.snapshotStore = snapshotStore
+        self.index = index
+        self.currentWeightsTimestamp = timestamp
+        #teams of nodes, set when teams are being detected
+        self.teams = None
+
+    #@return the rebuilt Graph object of this snapshot
+    def getGraph(self):
+        return self.snapshotStore.getSnapshot(self.index)
+
+    @property
+    def nodes(self):
+        return self.getGraph().nodes
+
+    @property
+    def edges(self):
+        return self.getGraph().edges
+
+    @property
+    def edgeWeights(self):
+        return self.getGraph().edgeWeights
+
+    @property
+    def nodeMap(self):
+        return self.getGraph().nodeMap
+
+    @property
+    def adjacency(self):
+        return self.getGraph().adjacency
+
+    @property
+    def neighborMap(self):
+        return self.getGraph().neighborMap
+
+    #@return Graph object that is a copy of this snapshot
+    def deepCopy(self):
+        return self.getGraph().deepCopy()
+
+    def getListOfNodeIDs(self):
+        return self.getGraph().getListOfNodeIDs()
+
+    def getEdges(self):
+        return self.getGraph().getEdges()
+
+    def numberOfNodes(self):
+        return self.getGraph().numberOfNodes()
+
+    def getMaxEdgeWeight(self):
+        return self.getGraph().getMaxEdgeWeight()
+
+    def getListOfEdges(self):
+        return self.getGraph().getListOfEdges()
+
+    def getNeighborIDs(self, resourceID):
+        return self.getGraph().getNeighborIDs(resourceID)
+
+    def findNode(self, resource):
+        return self.getGraph().findNode(resource)
+
+    def findEdge(self, resource1, resource2):
+        return self.getGraph().findEdge(resource1, resource2)
+
+    def findEdgeWeight(self, edge):
+        return self.getGraph().findEdgeWeight(edge)
+
+    #the networkx graph belongs to the rebuilt graph, so it is only kept while that graph is in the store's cache
+    def getNetworkxGraph(self):
+        return self.getGraph().getNetworkxGraph()
+
+    def createNetworkxGraph(self):
+        return self.getGraph().createNetworkxGraph()
+
+    def getCurrentWeightsTimestamp(self):
+        return self.currentWeightsTimestamp
+
+    def getTimestamp(self):
+        return self.currentWeightsTimestamp
+
+    """
+    @param teams: dict with node ID as key and community number as value
+    """
+    def setTeams(self, teams):
+        self.teams = teams
+
+    """
+    @return dict with the NodeID as key and community number as value
+    """
+    def getTeams(self):
+        return self.teams
+
+    """
+    The changes are those of the SnapshotDelta of this snapshot, if previousGraph is the snapshot before it in the same store
+    @param previousGraph: Graph object
+    @return tuple (list of added Node objects, list of removed Edge objects, list of added Edge objects) with respect to previousGraph,
+            or None if the changes with respect to previousGraph are not known
+    """
+    def getChangesSince(self, previousGraph):
+        if not isinstance(previousGraph, StoredSnapshot) or previousGraph.snapshotStore is not self.snapshotStore or previousGraph.index != self.index - 1:
+            return None
+        delta = self.snapshotStore.deltas[self.index]
+        return delta.addedNodes, delta.removedEdges, delta.addedEdges
@@ -1,137 +1,352 @@
 #code to match teams between 2 graph snapshots
-import copy
+import collections
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import scipy.sparse
+import scipy.sparse.csgraph
+from scipy.optimize import linear_sum_assignment
+
+#ways to match the teams
+#greedy: each team is matched with the team with the most nodes in common, conflicts are resolved one by one (see findBestTeamMatches)
+GREEDY = "greedy"
+#optimal: the matches with the highest total score (see findOptimalTeamMatches), the score is the number of nodes in common ...
+OVERLAP = "overlap"
+#... or the Jaccard index of the two teams
+JACCARD = "jaccard"
+#up to this number of pairs of teams, the optimal matches are found on the full score matrix instead of per block of overlapping teams
+DENSE_MATCHING_SIZE = 10000
 
 """
     Compare the previous graph snapshot with the current 
     Find the best matches between the teams in the previousGraph and in graph 
     @param previousGraph Graph object representing the first snapshot 
     @param graph Graph object representing the second snapshot 
+    @param matchingMethod GREEDY, OVERLAP or JACCARD 
     @return list of tuples where the first element of the tuple is a set of node IDs that represent a team in the first snapshot 
             and the second element a set of node IDs representing the same team in the second snapshot 
             Best match is based on most elements in common 
 """
-def matchTeamsBetweenSnapshots(previousGraph, graph):
+def matchTeamsBetweenSnapshots(previousGraph, graph, matchingMethod = GREEDY):
     #return dict with key is Node ID and value is community ID
-    previousTeams = previousGraph.getTeams()
-    currentTeams = graph.getTeams()
+    return matchTeamAssignments(previousGraph.getTeams(), graph.getTeams(), matchingMethod)
+
+
+"""
+    Match the teams of two snapshots from their team assignments, see matchTeamsBetweenSnapshots 
+    Only the team assignments are needed, so the snapshots can be matched in another process 
+    @param previousTeams dict with node ID as key and team number as value of the first snapshot 
+    @param currentTeams dict with node ID as key and team number as value of the second snapshot 
+    @param matchingMethod GREEDY, OVERLAP or JACCARD 
+    @return list of tuples of matching teams, see matchTeamsBetweenSnapshots 
+"""
+def matchTeamAssignments(previousTeams, currentTeams, matchingMethod = GREEDY):
     #transform into list of teams
     previousTeamsList = transFormIntoSet(previousTeams)
     currentTeamsList = transFormIntoSet(currentTeams)
 
     #match teams: tuples of a team of the previous list and a team of the current list (or None if no match)
-    teamMatches = findBestTeamMatches(previousTeamsList,currentTeamsList)
+    matchIndices = findTeamMatchIndices(previousTeamsList, currentTeamsList, matchingMethod)
+    return teamMatchesFromIndices(matchIndices, previousTeamsList, currentTeamsList)
 
-    return teamMatches
+
+"""
+    Match the teams of two snapshots from their team assignments, in a worker process 
+    Only the indices of the teams are sent back: the sets of node IDs are built by the main process, in the same way as matchTeamAssignments does 
+    @param previousTeams dict with node ID as key and team number as value of the first snapshot 
+    @param currentTeams dict with node ID as key and team number as value of the second snapshot 
+    @param matchingMethod GREEDY, OVERLAP or JACCARD 
+    @return list of tuples of the indices of matching teams in the team lists of transFormIntoSet, see findTeamMatchIndices 
+"""
+def matchTeamAssignmentIndices(previousTeams, currentTeams, matchingMethod = GREEDY):
+    return findTeamMatchIndices(transFormIntoSet(previousTeams), transFormIntoSet(currentTeams), matchingMethod)
+
+
+"""
+    @param previousTeams : list of sets where each set contains node IDs that belong to the same team
+    @param currentTeams: list of sets where each set contains node IDs that belong to the same team
+    @param matchingMethod GREEDY, OVERLAP or JACCARD 
+    @return list of tuples with the index of the team in previousTeams and the index of the team in currentTeams, None if a team has no match 
+"""
+def findTeamMatchIndices(previousTeams, currentTeams, matchingMethod = GREEDY):
+    if matchingMethod == GREEDY:
+        return findBestTeamMatchIndices(previousTeams, currentTeams)
+    return findOptimalTeamMatchIndices(previousTeams, currentTeams, matchingMethod)
 
 
 
 
+"""
+    Match the teams of each snapshot with those of the previous snapshot, one snapshot at a time 
+    Only the previous snapshot is kept 
+    @param snapshots iterable of Graph objects ordered in time, with their teams detected 
+    @param matchingMethod GREEDY, OVERLAP or JACCARD 
+    @return generator of tuples (Graph object, list of team matches with the previous snapshot), the team matches of the first snapshot are None 
+"""
+def matchTeamsInStream(snapshots, matchingMethod = GREEDY):
+    previousSnapshot = None
+    for graph in snapshots:
+        teamMatches = None
+        if previousSnapshot:
+            # compare wih the previous snapshot to match the teams
+            teamMatches = matchTeamsBetweenSnapshots(previousSnapshot, graph, matchingMethod)
+        yield graph, teamMatches
+        previousSnapshot = graph
+
+
+"""
+    Match the teams of each snapshot with those of the previous snapshot in a pool of processes 
+    The pairs of snapshots are independent: only the team assignments of the snapshots are sent to the worker processes 
+    @param snapshots list of Graph objects ordered in time, with their teams detected 
+    @param matchingMethod GREEDY, OVERLAP or JACCARD 
+    @param numberOfProcesses number of worker processes, None for the number of processors 
+    @return list with the team matches of each snapshot (from the second one) with its previous snapshot, in the order of the snapshots 
+"""
+def matchTeamsInParallel(snapshots, matchingMethod = GREEDY, numberOfProcesses = None):
+    teamAssignments = [graph.getTeams() for graph in snapshots]
+    numberOfPairs = len(teamAssignments) - 1
+    if numberOfPairs < 1:
+        return []
+
+    #a few chunks of consecutive pairs per process, to limit the communication with the processes
+    chunkSize = max(1, numberOfPairs // (4 * (numberOfProcesses or os.cpu_count() or 1)))
+    with ProcessPoolExecutor(max_workers = numberOfProcesses) as executor:
+        pairMatchIndices = executor.map(matchTeamAssignmentIndices, teamAssignments[:-1], teamAssignments[1:], [matchingMethod] * numberOfPairs, chunksize = chunkSize)
+
+        allTeamMatches = []
+        currentTeamsList = transFormIntoSet(teamAssignments[0])
+        for currentTeams, matchIndices in zip(teamAssignments[1:], pairMatchIndices):
+            previousTeamsList = currentTeamsList
+            currentTeamsList = transFormIntoSet(currentTeams)
+            allTeamMatches.append(teamMatchesFromIndices(matchIndices, previousTeamsList, currentTeamsList))
+    return allTeamMatches
+
+
 """
     @communityDict: dict with nodeID as key and team number as value 
     @return list of sets: where each set consists of nodeIDs that belong to the same community 
 """
 def transFormIntoSet(communityDict):
-    teamList = []
-    communities = set(val for val in communityDict.values())
-    for team in communities:
-        #get all nodes that belong to the team
-        teamList.append(set([nodeID for nodeID, teamID in communityDict.items() if teamID == team]))
-    return teamList
+    members = {}
+    for nodeID, teamID in communityDict.items():
+        members.setdefault(teamID, []).append(nodeID)
+    #the teams are listed in the order of the set of team numbers
+    return [set(members[team]) for team in set(communityDict.values())]
 
 
 """
     Pair communities : match the communities of previousTeams with the best matching communities in currentTeams 
     Based on how many nodes are the same 
+    Each previous team points to the current team with which it has the most nodes in common (the first one in currentTeams if there is a tie)
+    A conflict is a current team that is the best match of multiple previous teams: it is matched with the previous team that has the most nodes in common (the first one in previousTeams if there is a tie), 
+    and the other previous teams point to their next best match
+    The conflicts are resolved in the order of the first previous team that points to them, the previous teams that are not in a conflict keep their best match
     @param previousTeams : list of sets where each set contains node IDs that belong to the same team
     @param currentTeams: list of sets where each set contains node IDs that belong to the same team
     @return list of tuples with the first element being the team in the previous snapshot, and the second element being the team in the current snapshot 
     if a previous team or a current team has no match, the other element will be None 
+    the matches of the conflicts come first in the order in which they were resolved, then the other matches in the order of previousTeams, then the current teams without a match, then the previous teams without a match
 """
 def findBestTeamMatches(previousTeams, currentTeams):
+    return teamMatchesFromIndices(findBestTeamMatchIndices(previousTeams, currentTeams), previousTeams, currentTeams)
+
+
+"""
+    See findBestTeamMatches 
+    @return list of tuples with the index of the team in previousTeams and the index of the team in currentTeams, None if a team has no match 
+"""
+def findBestTeamMatchIndices(previousTeams, currentTeams):
     matches = []
-    #deep copy
-    previousTeamsCopy = copy.deepcopy(previousTeams)
-    currentTeamsCopy = copy.deepcopy(currentTeams)
-
-    recalculate = True
-
-    while recalculate:
-        teamMatchDict = {}
-        for team in previousTeamsCopy:
-            bestMatch, numberOfMatchinItems = findBestMatchInList(team,currentTeamsCopy)
-            #if bestMatch is not None
-            if bestMatch:
-                #hash needs to be frozenset
-                teamMatchDict[frozenset(team)] = (bestMatch,numberOfMatchinItems)
-
-        recalculate = False
-        #repeat until no two teams have the same bestMatch
-        for team, matchInfo in teamMatchDict.items():
-        # check if another team has the same match
-            teamList = findTeamsWithThisMatch(matchInfo[0],teamMatchDict)
-            #if there are multiple teams, resolve this
-            if len(teamList) > 1:
-                #the most matching one
-                bestMatchingTeam = max(teamList, key=teamList.get)
-                #tuple of previousteam and currentteam: convert previousteam from frozenset back to set
-                matches.append((set(bestMatchingTeam),matchInfo[0]))
-                #both need to be taken out of the dict and it needs to be run again
-
-                previousTeamsCopy.remove(bestMatchingTeam)
-                currentTeamsCopy.remove(matchInfo[0])
-                recalculate = True
-                break
-            #if there aren't we break from the while loop and do not recalculate
-
-    #the teamMatchDict does not contain duplicate matches anymore
-    #process the matches still in this dict
-    for team, matchInfo in teamMatchDict.items():
-        #the match can be a set or None if there is no match
-        matches.append((set(team),matchInfo[0]))
-        previousTeamsCopy.remove(team)
-        currentTeamsCopy.remove(matchInfo[0])
+
+    #inverted index: node ID -> index of its team in currentTeams
+    currentTeamOfNode = {nodeID: c for c, team in enumerate(currentTeams) for nodeID in team}
+    #for each previous team a heap of candidates (-number of nodes in common, index of the current team), only the current teams it has nodes in common with
+    candidates = []
+    for team in previousTeams:
+        overlap = collections.Counter(currentTeamOfNode[nodeID] for nodeID in team if nodeID in currentTeamOfNode)
+        heap = [(-numberOfMatchingItems, c) for c, numberOfMatchingItems in overlap.items()]
+        heapq.heapify(heap)
+        candidates.append(heap)
+
+    matchedPreviousTeams = set()
+    matchedCurrentTeams = set()
+    #index of the best match of each previous team, if it has one
+    bestMatches = {}
+    #dict with the index of a current team as key and the list of indices of the previous teams whose best match it is as value
+    claimants = {}
+    #heap of the conflicts (index of the first previous team that points to the current team, index of the current team)
+    #an entry is outdated if the current team is matched or its first claimant changed in the meantime
+    conflicts = []
+
+    #point the previous team to its best current team that is not matched yet
+    def findNextBestMatch(p):
+        heap = candidates[p]
+        while heap and heap[0][1] in matchedCurrentTeams:
+            heapq.heappop(heap)
+        if heap:
+            c = heap[0][1]
+            bestMatches[p] = c
+            claimants.setdefault(c, []).append(p)
+            if len(claimants[c]) > 1:
+                heapq.heappush(conflicts, (min(claimants[c]), c))
+
+    for p in range(len(previousTeams)):
+        findNextBestMatch(p)
+
+    while conflicts:
+        firstClaimant, c = heapq.heappop(conflicts)
+        if c in matchedCurrentTeams or firstClaimant != min(claimants[c]):
+            continue
+        #the most matching one, the first one if there is a tie
+        bestMatchingTeam = min(claimants[c], key = lambda p: (candidates[p][0][0], p))
+        matches.append((bestMatchingTeam, c))
+        #both are taken out, the other previous teams point to their next best match
+        matchedPreviousTeams.add(bestMatchingTeam)
+        matchedCurrentTeams.add(c)
+        del bestMatches[bestMatchingTeam]
+        for p in claimants.pop(c):
+            if p != bestMatchingTeam:
+                del bestMatches[p]
+                findNextBestMatch(p)
+
+    #no two previous teams have the same best match anymore
+    for p in sorted(bestMatches):
+        matches.append((p, bestMatches[p]))
+        matchedPreviousTeams.add(p)
+        matchedCurrentTeams.add(bestMatches[p])
     ################
     #there may be teams left from the current team list and previous team list that do not have a match , add these
-    for team in currentTeamsCopy:
-        #add to the list without a match
-        matches.append((None,team))
-    for team in previousTeamsCopy:
-        #add to the list without a match
-        matches.append((team, None))
+    for c in range(len(currentTeams)):
+        if c not in matchedCurrentTeams:
+            #add to the list without a match
+            matches.append((None, c))
+    for p in range(len(previousTeams)):
+        if p not in matchedPreviousTeams:
+            #add to the list without a match
+            matches.append((p, None))
 
     return matches
 
 
 """
-    Find the keys where the [O] of the value is match
-    @param match set of nodeIDs that form a team
-    @param teamDict dictionary with set of node IDs as key, and as value a tuple (set of node IDs, number of equivalent nodes between key and value) 
-    @return dictionary with team as key and number of equivalent nodes as value 
+    Pair communities as a linear assignment problem: the matches are the pairs of teams with the highest total score, each team is matched at most once 
+    Unlike findBestTeamMatches, the result does not depend on the order of the teams 
+    @param previousTeams : list of sets where each set contains node IDs that belong to the same team
+    @param currentTeams: list of sets where each set contains node IDs that belong to the same team
+    @param scoring: OVERLAP to score a pair of teams on the number of nodes in common, JACCARD on the number of nodes in common divided by the number of nodes in either team 
+    @return list of tuples with the first element being the team in the previous snapshot, and the second element being the team in the current snapshot, in the order of previousTeams 
+    teams without nodes in common are not matched: if a previous team or a current team has no match, the other element will be None 
+    the current teams without a match come after the matches, then the previous teams without a match
+"""
+def findOptimalTeamMatches(previousTeams, currentTeams, scoring = OVERLAP):
+    return teamMatchesFromIndices(findOptimalTeamMatchIndices(previousTeams, currentTeams, scoring), previousTeams, currentTeams)
+
+
+"""
+    See findOptimalTeamMatches 
+    @return list of tuples with the index of the team in previousTeams and the index of the team in currentTeams, None if a team has no match 
 """
-def findTeamsWithThisMatch( match,teamDict):
-    results = {}
-    for team, matchInfo in teamDict.items():
+def findOptimalTeamMatchIndices(previousTeams, currentTeams, scoring = OVERLAP):
+    matches = []
+
+    #sparse overlap matrix: one entry for each node that is in both snapshots, the entries of the same pair of teams are summed
+    currentTeamOfNode = {nodeID: c for c, team in enumerate(currentTeams) for nodeID in team}
+    rows = []
+    columns = []
+    for p, team in enumerate(previousTeams):
+        for nodeID in team:
+            if nodeID in currentTeamOfNode:
+                rows.append(p)
+                columns.append(currentTeamOfNode[nodeID])
+    overlap = scipy.sparse.coo_matrix((np.ones(len(rows)), (rows, columns)), shape=(len(previousTeams), len(currentTeams))).tocsr().tocoo()
 
-        if matchInfo[0] == match:
-            results[team] = matchInfo[1]
-    return results
+    scores = overlap.data
+    if scoring == JACCARD:
+        previousSizes = np.array([len(team) for team in previousTeams])
+        currentSizes = np.array([len(team) for team in currentTeams])
+        scores = overlap.data / (previousSizes[overlap.row] + currentSizes[overlap.col] - overlap.data)
 
+    matchedPreviousTeams = set()
+    matchedCurrentTeams = set()
+    if overlap.nnz:
+        scoreMatrix = scipy.sparse.csr_matrix((scores, (overlap.row, overlap.col)), shape=overlap.shape)
+        if len(previousTeams) * len(currentTeams) <= DENSE_MATCHING_SIZE:
+            blocks = [(np.arange(len(previousTeams)), np.arange(len(currentTeams)))]
+        else:
+            #teams only compete for a match with the teams they overlap with: the blocks of overlapping teams are solved separately
+            blocks = findOverlappingBlocks(scoreMatrix)
+        for rows, columns in blocks:
+            blockScores = scoreMatrix[rows][:, columns].toarray()
+            for i, j in zip(*linear_sum_assignment(blockScores, maximize=True)):
+                #teams without nodes in common are no match
+                if blockScores[i, j] > 0:
+                    p, c = int(rows[i]), int(columns[j])
+                    matches.append((p, c))
+                    matchedPreviousTeams.add(p)
+                    matchedCurrentTeams.add(c)
+        #the matches are in the order of the previous teams
+        matches.sort()
+
+    for c in range(len(currentTeams)):
+        if c not in matchedCurrentTeams:
+            matches.append((None, c))
+    for p in range(len(previousTeams)):
+        if p not in matchedPreviousTeams:
+            matches.append((p, None))
+
+    return matches
+
+
+"""
+    Split the teams into blocks of teams that overlap with each other, directly or through other teams: 
+    the connected components of the bipartite graph of the previous and the current teams with an edge for each nonzero score 
+    @param scoreMatrix sparse matrix with a row for each previous team and a column for each current team 
+    @return list of tuples (array of the previous team indices, array of the current team indices) of each block with teams on both sides 
+"""
+def findOverlappingBlocks(scoreMatrix):
+    numberOfPreviousTeams = scoreMatrix.shape[0]
+    bipartiteGraph = scipy.sparse.bmat([[None, scoreMatrix], [scoreMatrix.T, None]])
+    numberOfBlocks, labels = scipy.sparse.csgraph.connected_components(bipartiteGraph, directed=False)
+
+    previousTeamsOfBlock = collections.defaultdict(list)
+    currentTeamsOfBlock = collections.defaultdict(list)
+    for index, label in enumerate(labels.tolist()):
+        if index < numberOfPreviousTeams:
+            previousTeamsOfBlock[label].append(index)
+        else:
+            currentTeamsOfBlock[label].append(index - numberOfPreviousTeams)
+    return [(np.array(previousTeamsOfBlock[label]), np.array(currentTeamsOfBlock[label])) for label in previousTeamsOfBlock if label in currentTeamsOfBlock]
 
 
 """
-    @param team list of nodeIDs
-    @param teamList list of list where each list consists of nodeIDS that represent a team 
-    @return the best matching team from teamList or None ; based on the number of equivalent node IDs
+    @param matchIndices list of tuples with the index of a team in previousTeams and the index of a team in currentTeams, or None 
+    @param previousTeams : list of sets where each set contains node IDs that belong to the same team
+    @param currentTeams: list of sets where each set contains node IDs that belong to the same team
+    @return list of tuples of a copy of the team in the previous snapshot and a copy of the team in the current snapshot, or None 
 """
-def findBestMatchInList(team, teamList):
-    bestMatch = None
-    numberOfMatchingItems = 0
-    for item in teamList:
-        intersect = list(set(team) & set(item))
+def teamMatchesFromIndices(matchIndices, previousTeams, currentTeams):
+    matches = []
+    for p, c in matchIndices:
+        if p is None:
+            matches.append((None, copyTeam(currentTeams[c])))
+        elif c is None:
+            matches.append((copyTeam(previousTeams[p]), None))
+        else:
+            matches.append((copyPreviousTeam(previousTeams[p]), copyTeam(currentTeams[c])))
+    return matches
 
-        if (len(intersect)) > numberOfMatchingItems:
-            bestMatch = item
-            numberOfMatchingItems = len(intersect)
 
-    return bestMatch,numberOfMatchingItems
+"""
+    The order in which the node IDs of a set are listed depends on how the set was built: 
+    the copies are built as by the original matcher, so the teams are printed in the same order 
+    @param team set of node IDs
+    @return copy of the team
+"""
+def copyTeam(team):
+    return set(list(team))
 
+#matched previous teams were kept as a frozenset
+def copyPreviousTeam(team):
+    return set(frozenset(copyTeam(team)))
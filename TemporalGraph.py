@@ -1,5 +1,6 @@
 #a temporal graph consists of multiple Graph objects
 #one for each time slice
+import bisect
 import csv
 import io
 
@@ -20,6 +21,14 @@ class TemporalGraph:
     #dictionary with Graph object from listOfGraph as the key, and the team matches with the previous snapshot as the value
         self.graphTeamMatches = {}
 
+    #positional index of the snapshots, to find a snapshot or a range of snapshots with a lookup or a binary search instead of walking the list
+    #dictionary with Graph object as key and its position as value: the position counts from the first snapshot ever added, also if it was removed
+        self.graphPositions = {graph: i for i, graph in enumerate(listOfGraphs)}
+    #number of snapshots removed from the start of timeListOfGraphs: the index of a snapshot in the list is its position minus this number
+        self.numberOfRemovedGraphs = 0
+    #timestamps of the snapshots in timeListOfGraphs, sorted as the snapshots are ordered in time
+        self.timestamps = [graph.getTimestamp() for graph in listOfGraphs]
+
 
 
     def getListOfGraphs(self):
@@ -37,6 +46,68 @@ class TemporalGraph:
     def appendGraphTeamMatch(self,graph, teamMatches):
         self.graphTeamMatches[graph] = teamMatches
 
+    """
+    Add a snapshot at the end of the temporal graph 
+    @param graph Graph object that is later in time than the snapshots in the temporal graph 
+    @param teamMatches team matches of this graph with its predecessor, or None if there are none 
+    """
+    def appendGraph(self, graph, teamMatches = None):
+        self.graphPositions[graph] = self.numberOfRemovedGraphs + len(self.timeListOfGraphs)
+        self.timestamps.append(graph.getTimestamp())
+        self.timeListOfGraphs.append(graph)
+        self.numberOfGraphs += 1
+        if teamMatches is not None:
+            self.appendGraphTeamMatch(graph, teamMatches)
+
+    """
+    Remove the snapshots (and their team matches) before the timestamp, to keep only a window of recent snapshots 
+    @param timestamp datetime object of the first snapshot to keep 
+    """
+    def removeGraphsBefore(self, timestamp):
+        numberOfRemovedGraphs = bisect.bisect_left(self.timestamps, timestamp)
+        for graph in self.timeListOfGraphs[:numberOfRemovedGraphs]:
+            self.graphTeamMatches.pop(graph, None)
+            del self.graphPositions[graph]
+        del self.timeListOfGraphs[:numberOfRemovedGraphs]
+        del self.timestamps[:numberOfRemovedGraphs]
+        self.numberOfGraphs -= numberOfRemovedGraphs
+        self.numberOfRemovedGraphs += numberOfRemovedGraphs
+
+    """
+    @param graph Graph object 
+    @return index of the snapshot in the list of graphs, or None if it is not a snapshot of this temporal graph 
+    """
+    def getIndexOfGraph(self, graph):
+        position = self.graphPositions.get(graph)
+        if position is None:
+            return None
+        return position - self.numberOfRemovedGraphs
+
+    """
+    @param beginSnapshot : Graph object that is the first to include
+    @param endSnapshot : Graph object that is the last to include
+    @return list of graph snapshots that begins with beginSnapshot and ends with endSnapshot 
+            empty if beginSnapshot is not in the temporal graph, up to the last snapshot if endSnapshot is not in the temporal graph after beginSnapshot 
+    """
+    def getSnapshotsWithinRange(self, beginSnapshot, endSnapshot):
+        begin = self.getIndexOfGraph(beginSnapshot)
+        if begin is None:
+            return []
+        end = self.getIndexOfGraph(endSnapshot)
+        if end is None or end < begin:
+            end = len(self.timeListOfGraphs) - 1
+        return self.timeListOfGraphs[begin:end + 1]
+
+    """
+    @param beginTS datetime object of the first timestamp to include 
+    @param endTS datetime object of the last timestamp to include 
+    @return list of the graph snapshots with a timestamp within [beginTS, endTS] 
+    """
+    def getSnapshotsWithinTimeRange(self, beginTS, endTS):
+        begin = bisect.bisect_left(self.timestamps, beginTS)
+        end = bisect.bisect_right(self.timestamps, endTS)
+        return self.timeListOfGraphs[begin:end]
+
     def getAllGraphTeamMatches(self):
         return self.graphTeamMatches
 
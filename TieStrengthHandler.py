@@ -26,6 +26,12 @@ class TieStrengthHandler:
         else:
             self.scale = self.__calculateHalfLife(periodOfTotalDecay)
 
+        #constants of the decay function, calculated once
+        self.squaredScale = self.scale**2
+        self.logDecay = np.log(self.decay)
+        self.logThreshold = np.log(self.threshold)
+        self.decayDenominator = self.squaredScale / self.logDecay
+
     """
     Calculate the half life based on a constant threshold value and the period of total decay 
     Half life is the square root of ln(decay)* the period in timesteps squared;    with decay == 0.5! 
@@ -95,8 +101,7 @@ class TieStrengthHandler:
     def decayEdgeWeight(self,currentWeight,numberOfTimeSteps) :
 
         value = max(0, (numberOfTimeSteps - self.offset))**2
-        denominator = (self.scale**2) / np.log(self.decay)
-        value = value / denominator
+        value = value / self.decayDenominator
         decayedWeight = currentWeight * math.exp(value)
         #upper bound to tie strength
         newWeight = min(decayedWeight, self.upperBoundary)
@@ -114,8 +119,8 @@ class TieStrengthHandler:
         #Add offset to currentTS to form the new starting point : offset is in timesteps so multiple
         updatedCurrentTS = currentTS + timedelta(minutes=(self.offset * self.timeStep))
 
-        nominator = (np.log(self.threshold) - np.log(currentWeight))*(self.scale**2)
-        value = nominator / (np.log(self.decay))
+        nominator = (self.logThreshold - np.log(currentWeight))*self.squaredScale
+        value = nominator / self.logDecay
         totalTimesteps = math.sqrt(value)
 
         #at currentTS + the number of timesteps, the weight value will be equal to the threshold, after that the edge will be removed
@@ -125,3 +130,34 @@ class TieStrengthHandler:
         predictedDecayTS = predictedDecayTS + timedelta(minutes = 1)
 
         return predictedDecayTS
+
+
+
+    """
+    Batch version of handleInteraction
+    @param currentTieStrengths: array of tie strengths
+    @returns array with the tie strengths after an interaction
+    """
+    def handleInteractionBatch(self,currentTieStrengths):
+        return np.minimum(np.asarray(currentTieStrengths, dtype=np.float64) + self.jumpSize, self.upperBoundary)
+
+    """
+    Batch version of calculateNumberOfTimeSteps
+    @param timeDifferences: array of the number of microseconds between the begin and target timestamps
+    @returns array with the number of timesteps (fractions) for each time difference
+    """
+    def calculateNumberOfTimeStepsBatch(self,timeDifferences):
+        timeDifferences = np.asarray(timeDifferences, dtype=np.int64) / 10**6 / 60
+        return timeDifferences / self.timeStep
+
+    """
+    Batch version of decayEdgeWeight, gives the same weights as decayEdgeWeight up to rounding of the exponential function
+    @param currentWeights: array of the weights at the moment of the last event on each edge
+    @param numberOfTimeSteps: array of the number of timesteps since the last event on each edge
+    @returns array with the edge weights after their number of timesteps
+    """
+    def decayEdgeWeightBatch(self,currentWeights,numberOfTimeSteps):
+        value = np.maximum(0, np.asarray(numberOfTimeSteps, dtype=np.float64) - self.offset)**2
+        value = value / self.decayDenominator
+        decayedWeights = np.asarray(currentWeights, dtype=np.float64) * np.exp(value)
+        return np.minimum(decayedWeights, self.upperBoundary)
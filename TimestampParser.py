@@ -0,0 +1,54 @@
+#Fast parser for the fixed timestamp layouts used in the session files
+import re
+from datetime import datetime
+
+
+class TimestampParser:
+
+    #regular expressions for the layouts that can be parsed without strptime
+    #only plain ASCII digits are accepted, everything else is passed on to strptime
+    LAYOUTS = {
+        "%d/%m/%Y %H:%M:%S": re.compile(r"([0-9]{1,2})/([0-9]{1,2})/([0-9]{4}) ([0-9]{1,2}):([0-9]{1,2}):([0-9]{1,2})"),
+        "%d/%m/%Y, %H:%M:%S": re.compile(r"([0-9]{1,2})/([0-9]{1,2})/([0-9]{4}), ([0-9]{1,2}):([0-9]{1,2}):([0-9]{1,2})")
+    }
+
+    """
+    @param format: strptime format of the timestamps
+    @param maxCacheSize: maximum number of timestamp strings that are remembered, the cache is cleared when it is full
+    """
+    def __init__(self, format, maxCacheSize = 100000):
+        self.format = format
+        self.layout = self.LAYOUTS.get(format)
+        self.maxCacheSize = maxCacheSize
+        #dict with the timestamp string as key and the datetime object as value
+        self.cache = {}
+
+    """
+    Sessions often share the same first, last or median timestamp, so the result of each string is cached
+    @param text: string containing a timestamp in the format of this parser
+    @return datetime object, identical to datetime.strptime(text, format)
+    """
+    def parse(self, text):
+        timestamp = self.cache.get(text)
+        if timestamp is None:
+            timestamp = self.__parseUncached(text)
+            if len(self.cache) >= self.maxCacheSize:
+                self.cache.clear()
+            self.cache[text] = timestamp
+        return timestamp
+
+    """
+    @param text: string containing a timestamp in the format of this parser
+    @return datetime object; strptime is used for strings that do not match the fixed layout or hold invalid values,
+            so the same ValueError is raised for malformed timestamps
+    """
+    def __parseUncached(self, text):
+        if self.layout is not None:
+            match = self.layout.fullmatch(text)
+            if match:
+                day, month, year, hour, minute, second = match.groups()
+                try:
+                    return datetime(int(year), int(month), int(day), int(hour), int(minute), int(second))
+                except ValueError:
+                    pass
+        return datetime.strptime(text, self.format)
@@ -1,5 +1,6 @@
 import operator
 import argparse
+import sys
 import csv
 import Dataparser
 import GraphEvolutionParser
@@ -7,19 +8,25 @@ from datetime import datetime
 import TieStrengthHandler
 import GraphVisualizer
 import MembershipChangeMonitor
+import TeamMatcher
 import Output
 
 
-def main(resourcesFile,objectsFile,collabSessionsFile,workSessionsFile, periodOfTotalDecay,beginTS,endTS):
+def main(resourcesFile,objectsFile,collabSessionsFile,workSessionsFile, periodOfTotalDecay,beginTS,endTS, streaming = False, cacheDirectory = None, deltaEncoded = False, lazy = False, tolerance = None, numberOfProcesses = None, windowSize = None, matchingMethod = TeamMatcher.GREEDY, matchingProcesses = None):
         #parse all data
         dataparser = Dataparser.DataParser()
 
-        dataparser.parseAllData(resourcesFile,objectsFile,collabSessionsFile,workSessionsFile)
+        #in streaming mode the collaboration sessions are turned into collaboration events while reading the file in chunks
+        #if a cache directory is given, unchanged input files are loaded from the cache instead of parsed again
+        try:
+                dataparser.parseAllData(resourcesFile,objectsFile,collabSessionsFile,workSessionsFile, streaming = streaming, cacheDirectory = cacheDirectory)
+        except Dataparser.DataParseError as e:
+                sys.exit(str(e))
 
 
         resources = dataparser.getResourceList()
         objects = dataparser.getObjectList()
-        collabEvents = dataparser.getCollabEventsList()
+        collabEvents = dataparser.getCollabEventStore()
         workEvents = dataparser.getWorkEventsList()
 
 
@@ -38,8 +45,24 @@ def main(resourcesFile,objectsFile,collabSessionsFile,workSessionsFile, periodOf
         #The time slice argument is used to produce a visualization of the graph that shows all events as snapshots and in the absence of events it shows snapshots for every timeslice
         #currently the time slice mechanism is disabled in the createTemporalGraph function of the GraphEvolutionParser. If you want to turn it on, uncomment the necessary code in the GraphEvolutionParser file
         #time slice is now 3 days : this is to update the visualization: if no event happens, show every 3 days
-        temporalGraph = graphEvolutionParser.createTemporalGraph(beginTS,endTS,4320)
-        graphEvolutionParser.detectTemporalTeams(temporalGraph)
+        #if lazy, the snapshots are created, analyzed, and discarded one at a time: the changes are found while the snapshots are created
+        if lazy:
+                snapshots = graphEvolutionParser.createTemporalGraph(beginTS,endTS,4320,lazy = True)
+                snapshots = graphEvolutionParser.detectTeamsInStream(snapshots, tolerance, numberOfProcesses)
+                matchedSnapshots = TeamMatcher.matchTeamsInStream(snapshots, matchingMethod)
+                membershipChangeMonitor = MembershipChangeMonitor.MembershipChangeMonitor()
+                #the snapshots are not kept, so the changes are printed in the console as soon as they are found
+                for typeOfChange, changes in membershipChangeMonitor.detectMembershipChangesInStream(matchedSnapshots):
+                        typeOfChange.printDetectedChanges(changes)
+                return
+
+        #if deltaEncoded, the snapshots are stored as changes with respect to the previous snapshot and rebuilt when needed
+        temporalGraph = graphEvolutionParser.createTemporalGraph(beginTS,endTS,4320,deltaEncoded)
+        #if windowSize, the teams are detected jointly over windows of consecutive snapshots, the windows in parallel
+        if windowSize:
+                graphEvolutionParser.detectTemporalTeamsInWindows(temporalGraph, windowSize, numberOfProcesses)
+        else:
+                graphEvolutionParser.detectTemporalTeams(temporalGraph, tolerance, numberOfProcesses)
 
 
         #visualize the temporalgraph
@@ -47,7 +70,7 @@ def main(resourcesFile,objectsFile,collabSessionsFile,workSessionsFile, periodOf
         #graphViz.visualizeTemporalGraph(temporalGraph)
 
         #Identify membership changes
-        membershipChangeMonitor = MembershipChangeMonitor.MembershipChangeMonitor(temporalGraph)
+        membershipChangeMonitor = MembershipChangeMonitor.MembershipChangeMonitor(temporalGraph, matchingMethod, matchingProcesses)
         membershipChangeMonitor.detectMembershipChanges()
 
         #Uncomment the next line to print in the console
@@ -59,38 +82,70 @@ def main(resourcesFile,objectsFile,collabSessionsFile,workSessionsFile, periodOf
 
 
 ########################################
-#Test on artificial data
-resourcesFile = "AI_resources.csv"
-objectsFile = "AI_objects.csv"
-collabSessionsFile = "AI_collab_sessions.csv"
-workSessionsFile = None
-periodOfTotalDecay = 17*24*60  #after 17 days total decay
-beginTS = datetime.strptime("1/03/2022, 09:00:00", "%d/%m/%Y, %H:%M:%S")
-endTS = datetime.strptime("1/03/2023, 01:00:00", "%d/%m/%Y, %H:%M:%S")
-
-#parse the command line arguments
-print("Parsing the arguments")
-parser = argparse.ArgumentParser()
-parser.add_argument("-r","--resources_filename",help="pass the resources CSV filename")
-parser.add_argument("-o","--objects_filename",help="pass the objects CSV filename")
-parser.add_argument("-cs","--collab_sessions",help="pass the collaboration sessions CSV filename")
-parser.add_argument("-ws","--work_sessions",help="pass the work sessions CSV filename")
-parser.add_argument("-pod","--period_of_decay",help = "After how long no collaboration does the collaboration relationship between two resources disappear? (in minutes) ")
-parser.add_argument("-bts","--beginTS",help = "pass the begin timestamp of the project (period you want to analyze) in the format %d/%m/%Y %H:%M:%S")
-parser.add_argument("-ets","--endTS",help = "pass the end timestamp of the period you want to analyze in the format %d/%m/%Y %H:%M:%S")
-
-args = parser.parse_args()
-#If there is no resource file, assume that the test data is run
-if args.resources_filename:
-        resourcesFile = args.resources_filename
-        objectsFile = args.objects_filename
-        collabSessionsFile = args.collab_sessions
-        workSessionsFile = args.work_sessions
-        periodOfTotalDecay = int(args.period_of_decay)
-        beginTS =  datetime.strptime(args.beginTS, "%d/%m/%Y %H:%M:%S")
-        endTS =  datetime.strptime(args.endTS, "%d/%m/%Y %H:%M:%S")
-
-
-
-#run the program
-main(resourcesFile,objectsFile,collabSessionsFile,workSessionsFile,periodOfTotalDecay,beginTS,endTS)
+#the worker processes (-p, -w, -mp) import this file: only run the program when it is started itself
+if __name__ == "__main__":
+        #Test on artificial data
+        resourcesFile = "AI_resources.csv"
+        objectsFile = "AI_objects.csv"
+        collabSessionsFile = "AI_collab_sessions.csv"
+        workSessionsFile = None
+        periodOfTotalDecay = 17*24*60  #after 17 days total decay
+        beginTS = datetime.strptime("1/03/2022, 09:00:00", "%d/%m/%Y, %H:%M:%S")
+        endTS = datetime.strptime("1/03/2023, 01:00:00", "%d/%m/%Y, %H:%M:%S")
+        streaming = False
+        cacheDirectory = None
+        deltaEncoded = False
+        lazy = False
+        tolerance = None
+        numberOfProcesses = None
+        windowSize = None
+        matchingMethod = TeamMatcher.GREEDY
+        matchingProcesses = None
+
+        #parse the command line arguments
+        print("Parsing the arguments")
+        parser = argparse.ArgumentParser()
+        parser.add_argument("-r","--resources_filename",help="pass the resources CSV filename")
+        parser.add_argument("-o","--objects_filename",help="pass the objects CSV filename")
+        parser.add_argument("-cs","--collab_sessions",help="pass the collaboration sessions CSV filename")
+        parser.add_argument("-ws","--work_sessions",help="pass the work sessions CSV filename")
+        parser.add_argument("-pod","--period_of_decay",help = "After how long no collaboration does the collaboration relationship between two resources disappear? (in minutes) ")
+        parser.add_argument("-bts","--beginTS",help = "pass the begin timestamp of the project (period you want to analyze) in the format %d/%m/%Y %H:%M:%S")
+        parser.add_argument("-ets","--endTS",help = "pass the end timestamp of the period you want to analyze in the format %d/%m/%Y %H:%M:%S")
+        parser.add_argument("-s","--streaming",action = "store_true",help = "read the collaboration sessions CSV file in chunks without keeping the sessions in memory")
+        parser.add_argument("-c","--cache_dir",help = "pass a directory in which the parsed input data is cached, unchanged input files are not parsed again")
+        parser.add_argument("-d","--delta_encoded",action = "store_true",help = "store the graph snapshots as changes with respect to the previous snapshot to reduce memory use for long periods")
+        parser.add_argument("-l","--lazy",action = "store_true",help = "create and analyze the graph snapshots one at a time without keeping them in memory")
+        parser.add_argument("-t","--tolerance",type = float,help = "skip the community detection of a snapshot if no node or edge was added or removed and no edge weight changed more than this tolerance, only the changed parts of the graph are analyzed again")
+        parser.add_argument("-p","--processes",type = int,help = "detect the communities of each connected component of a snapshot separately, the large components in parallel by this number of processes")
+        parser.add_argument("-w","--window",type = int,help = "detect the communities jointly over windows of this number of consecutive snapshots, the windows in parallel with -p (not with -l)")
+        parser.add_argument("-m","--matching",choices = [TeamMatcher.GREEDY, TeamMatcher.OVERLAP, TeamMatcher.JACCARD],default = TeamMatcher.GREEDY,help = "how the teams are matched between snapshots: greedy (default), or the optimal matches on the number of nodes in common (overlap) or on the Jaccard index (jaccard)")
+        parser.add_argument("-mp","--matching_processes",type = int,help = "match the teams of the pairs of consecutive snapshots in parallel by this number of processes (not with -l)")
+
+        args = parser.parse_args()
+        #the engine per connected component does not skip snapshots, see CommunityDetection.createCommunityEngine
+        if args.tolerance is not None and args.processes is not None and not args.window:
+                parser.error("argument -t/--tolerance cannot be combined with -p/--processes")
+        streaming = args.streaming
+        cacheDirectory = args.cache_dir
+        deltaEncoded = args.delta_encoded
+        lazy = args.lazy
+        tolerance = args.tolerance
+        numberOfProcesses = args.processes
+        windowSize = args.window
+        matchingMethod = args.matching
+        matchingProcesses = args.matching_processes
+        #If there is no resource file, assume that the test data is run
+        if args.resources_filename:
+                resourcesFile = args.resources_filename
+                objectsFile = args.objects_filename
+                collabSessionsFile = args.collab_sessions
+                workSessionsFile = args.work_sessions
+                periodOfTotalDecay = int(args.period_of_decay)
+                beginTS =  datetime.strptime(args.beginTS, "%d/%m/%Y %H:%M:%S")
+                endTS =  datetime.strptime(args.endTS, "%d/%m/%Y %H:%M:%S")
+
+
+
+        #run the program
+        main(resourcesFile,objectsFile,collabSessionsFile,workSessionsFile,periodOfTotalDecay,beginTS,endTS,streaming,cacheDirectory,deltaEncoded,lazy,tolerance,numberOfProcesses,windowSize,matchingMethod,matchingProcesses)
@@ -0,0 +1,55 @@
+#shared setup of the tests: the modules of the repository and the artificial data set
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY)
+
+import Dataparser
+import GraphEvolutionParser
+import TieStrengthHandler
+
+#the first months of the artificial data set
+BEGIN_TIMESTAMP = datetime(2022, 3, 1, 9)
+END_TIMESTAMP = datetime(2022, 6, 1, 9)
+TIME_SLICE_UNIT = 4320
+
+
+#@return path of a file of the artificial data set
+def dataFile(fileName):
+    return os.path.join(REPOSITORY, fileName)
+
+
+#@return DataParser object with the artificial data set parsed, with the options of parseAllData
+def parseArtificialData(**options):
+    dataparser = Dataparser.DataParser()
+    dataparser.parseAllData(dataFile("AI_resources.csv"), dataFile("AI_objects.csv"), dataFile("AI_collab_sessions.csv"), None, **options)
+    return dataparser
+
+
+#@return a new GraphEvolutionParser object for the parsed data, with the tie strength settings of main.py
+def createGraphEvolutionParser(dataparser):
+    tieStrengthHandler = TieStrengthHandler.TieStrengthHandler(60*12, 0.3, 17*24*60)
+    return GraphEvolutionParser.GraphEvolutionParser(dataparser.getResourceList(), dataparser.getObjectList(), dataparser.getCollabEventStore(), dataparser.getWorkEventsList(), tieStrengthHandler)
+
+
+#@return tuple (list of node IDs, list of tuples (source ID, target ID, weight) of the edges) of a snapshot
+def snapshotContents(snapshot):
+    return snapshot.getListOfNodeIDs(), snapshot.getListOfEdges()
+
+
+#Check that two EventStore objects hold the same resources, objects and events
+def assertSameEvents(eventStore, expectedEventStore):
+    assert [(resource.getID(), resource.getLabel()) for resource in eventStore.getResources()] == [(resource.getID(), resource.getLabel()) for resource in expectedEventStore.getResources()]
+    assert [(obj.getID(), obj.getLabel()) for obj in eventStore.getObjects()] == [(obj.getID(), obj.getLabel()) for obj in expectedEventStore.getObjects()]
+    for getColumn in ("getTimestamps", "getSources", "getTargets", "getObjectOffsets", "getObjectIndices"):
+        np.testing.assert_array_equal(getattr(eventStore, getColumn)(), getattr(expectedEventStore, getColumn)())
+
+
+@pytest.fixture(scope="session")
+def dataparser():
+    return parseArtificialData()
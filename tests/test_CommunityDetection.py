@@ -0,0 +1,72 @@
+import collections
+
+import pytest
+
+import CommunityDetection
+import Edge
+import Graph
+import Node
+import Resource
+from conftest import BEGIN_TIMESTAMP, END_TIMESTAMP, TIME_SLICE_UNIT, createGraphEvolutionParser
+
+
+@pytest.fixture(scope="module")
+def snapshots(dataparser):
+    return createGraphEvolutionParser(dataparser).createTemporalGraph(BEGIN_TIMESTAMP, END_TIMESTAMP, TIME_SLICE_UNIT).getListOfGraphs()
+
+
+#@return set of the frozensets of the node IDs of the edges of the igraph graph of the engine
+def engineEdgePairs(engine):
+    return {frozenset(engine.vertexIDs[v] for v in edge.tuple) for edge in engine.graph.es}
+
+
+@pytest.mark.parametrize("tolerance", [None, 0.05])
+def test_engineGraphFollowsTheSnapshots(snapshots, tolerance):
+    engine = CommunityDetection.LeidenCommunityEngine(tolerance)
+    for snapshot in snapshots:
+        partition = engine.detectCommunities(snapshot)
+
+        assert engine.vertexIDs == snapshot.getListOfNodeIDs()
+        assert engineEdgePairs(engine) == {frozenset(edge.getTupleFormatIDonly()) for edge in snapshot.getEdges()}
+        assert set(engine.graph.es["edge"] if engine.graph.ecount() else []) == set(snapshot.getEdges())
+
+        #isolated nodes are their own community
+        assert list(partition) == snapshot.getListOfNodeIDs()
+        communitySizes = collections.Counter(partition.values())
+        isolatedNodeIDs = [engine.vertexIDs[v] for v, degree in enumerate(engine.graph.degree()) if degree == 0]
+        assert sorted(engine.isolatedVertices) == [engine.vertexIndex[nodeID] for nodeID in isolatedNodeIDs]
+        assert all(communitySizes[partition[nodeID]] == 1 for nodeID in isolatedNodeIDs)
+
+
+def test_snapshotOutOfOrderStartsOver(snapshots):
+    engine = CommunityDetection.LeidenCommunityEngine()
+    for snapshot in snapshots[:10]:
+        engine.detectCommunities(snapshot)
+    engine.detectCommunities(snapshots[5])
+    assert engine.vertexIDs == snapshots[5].getListOfNodeIDs()
+    assert engineEdgePairs(engine) == {frozenset(edge.getTupleFormatIDonly()) for edge in snapshots[5].getEdges()}
+
+
+def test_edgeCreatedAgainKeepsItsPlace():
+    nodes = [Node.Node(Resource.Resource(i, str(i))) for i in range(4)]
+    oldEdge, otherEdge, newEdge = Edge.Edge(nodes[0], nodes[1]), Edge.Edge(nodes[1], nodes[2]), Edge.Edge(nodes[0], nodes[1])
+    previousGraph = Graph.Graph(list(nodes), [oldEdge, otherEdge], {oldEdge: 1.0, otherEdge: 2.0})
+    #the edge between 0 and 1 disappears and is created again in the same snapshot
+    graph = Graph.Graph(list(nodes), [otherEdge, newEdge], {otherEdge: 1.5, newEdge: 3.0})
+    graph.setChanges(previousGraph, [], [oldEdge], [newEdge])
+
+    engine = CommunityDetection.LeidenCommunityEngine(0.01)
+    engine.detectCommunities(previousGraph)
+    engine.detectCommunities(graph)
+    assert engine.graph.es["edge"] == [newEdge, otherEdge]
+    assert set(engine.referenceWeights) == {newEdge, otherEdge}
+
+
+def test_windowsGiveTheSamePartitionsInProcessAndInAPool(snapshots):
+    inProcess = CommunityDetection.detectTemporalCommunities(snapshots, 10)
+    assert CommunityDetection.detectTemporalCommunities(snapshots, 10, numberOfProcesses = 2) == inProcess
+    assert len(inProcess) == len(snapshots)
+    #every node of a snapshot is in a community, and the windows do not share community numbers
+    assert [sorted(partition) for partition in inProcess] == [sorted(snapshot.getListOfNodeIDs()) for snapshot in snapshots]
+    windowCommunities = [set().union(*(set(partition.values()) for partition in inProcess[i:i + 10])) for i in range(0, len(inProcess), 10)]
+    assert all(communities.isdisjoint(otherCommunities) for i, communities in enumerate(windowCommunities) for otherCommunities in windowCommunities[i + 1:])
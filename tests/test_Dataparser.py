@@ -0,0 +1,37 @@
+import pytest
+
+import Dataparser
+from conftest import dataFile, parseArtificialData, assertSameEvents
+
+HEADER = "ResourceID1;ResourceLabel1;ResourceID2;ResourceLabel2;ObjectID;ObjectName;FirstTS;LastTS;MedTS\n"
+SESSION = "{0};R{0};{1};R{1};1;Daily Standup 1;1/03/2022 10:00:00;1/03/2022 10:30:00;1/03/2022 10:00:00\n"
+
+
+#@return path of a collaboration sessions file with a session for each pair of resource IDs
+def writeCollabSessions(directory, pairs):
+    collabSessionsFile = directory / "collab_sessions.csv"
+    collabSessionsFile.write_text(HEADER + "".join(SESSION.format(*pair) for pair in pairs), encoding="utf-8")
+    return str(collabSessionsFile)
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_unknownResourceRaisesWithFileAndLine(tmp_path, streaming):
+    #the unknown resource 999 is on line 4 of the file, the chunks of 2 rows end on line 5
+    collabSessionsFile = writeCollabSessions(tmp_path, [(5, 14), (5, 8), (999, 8), (5, 10), (5, 13)])
+    dataparser = Dataparser.DataParser()
+    with pytest.raises(Dataparser.DataParseError) as error:
+        dataparser.parseAllData(dataFile("AI_resources.csv"), dataFile("AI_objects.csv"), collabSessionsFile, None, streaming = streaming, chunkSize = 2)
+    assert str(error.value) == "Parse error in " + collabSessionsFile + " on line 4: unknown resource ID 999, all resources must appear in the resource file"
+
+
+def test_missingFileDoesNotRaise(tmp_path, capsys):
+    dataparser = Dataparser.DataParser()
+    dataparser.parseAllData(dataFile("AI_resources.csv"), dataFile("AI_objects.csv"), str(tmp_path / "missing.csv"), None)
+    assert "Please provide the correct collaboration sessions CSV file name." in capsys.readouterr().out
+    assert dataparser.getCollabEventStore().getNumberOfEvents() == 0
+
+
+@pytest.mark.parametrize("chunkSize", [1, 7, 10000])
+def test_streamingGivesTheSameEvents(dataparser, chunkSize):
+    streamedData = parseArtificialData(streaming = True, chunkSize = chunkSize)
+    assertSameEvents(streamedData.getCollabEventStore(), dataparser.getCollabEventStore())
@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+
+import EventScheduler
+from conftest import BEGIN_TIMESTAMP, END_TIMESTAMP, TIME_SLICE_UNIT, createGraphEvolutionParser, snapshotContents
+
+
+#@return the first timestamp in ]beginTS, endTS] of the list, or None
+def firstTimestampWithin(timestamps, beginTS, endTS):
+    return min((timestamp for timestamp in timestamps if beginTS < timestamp <= endTS), default = None)
+
+
+def test_nextTimestampIsTheFirstEventWithinTheWindow(dataparser):
+    parser = createGraphEvolutionParser(dataparser)
+    eventStore = dataparser.getCollabEventStore()
+    scheduler = EventScheduler.EventScheduler(eventStore, parser.resourcePopUpTime)
+    timestamps = [eventStore.getEventTimestamp(i) for i in range(eventStore.getNumberOfEvents())] + list(parser.resourcePopUpTime.values())
+
+    beginTS = BEGIN_TIMESTAMP
+    while beginTS < END_TIMESTAMP:
+        endTS = beginTS + timedelta(minutes = TIME_SLICE_UNIT)
+        nextTimestamp = scheduler.searchNextEventTimestamp(beginTS, endTS)
+        assert nextTimestamp == firstTimestampWithin(timestamps, beginTS, endTS)
+        #move on as the snapshots do: to the next event, or to the end of the window
+        beginTS = nextTimestamp if nextTimestamp is not None else endTS
+
+
+def test_onlyTheLastScheduledRemovalOfAnEdgeCounts(dataparser):
+    scheduler = EventScheduler.EventScheduler(dataparser.getCollabEventStore(), {})
+    beginTS = datetime(2000, 1, 1)
+    edge1, edge2 = object(), object()
+    scheduler.scheduleEdgeRemoval(edge1, beginTS + timedelta(hours = 1))
+    scheduler.scheduleEdgeRemoval(edge2, beginTS + timedelta(hours = 2))
+    #rescheduled: the first entry of edge1 is no longer valid
+    scheduler.scheduleEdgeRemoval(edge1, beginTS + timedelta(hours = 3))
+    assert scheduler.searchNextEventTimestamp(beginTS, beginTS + timedelta(days = 1)) == beginTS + timedelta(hours = 2)
+
+    scheduler.cancelEdgeRemoval(edge2)
+    assert scheduler.searchNextEventTimestamp(beginTS, beginTS + timedelta(days = 1)) == beginTS + timedelta(hours = 3)
+    assert scheduler.getEdgeRemovalTimes() == {edge1: beginTS + timedelta(hours = 3)}
+
+
+def test_eachTemporalGraphStartsWithANewScheduler(dataparser):
+    parser = createGraphEvolutionParser(dataparser)
+    firstSnapshots = [snapshotContents(snapshot) for snapshot in parser.createTemporalGraph(BEGIN_TIMESTAMP, END_TIMESTAMP, TIME_SLICE_UNIT).getListOfGraphs()]
+    secondSnapshots = [snapshotContents(snapshot) for snapshot in parser.createTemporalGraph(BEGIN_TIMESTAMP, END_TIMESTAMP, TIME_SLICE_UNIT).getListOfGraphs()]
+    assert secondSnapshots == firstSnapshots
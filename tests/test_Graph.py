@@ -0,0 +1,71 @@
+import pytest
+
+import Graph
+import Resource
+import TieStrengthHandler
+
+
+@pytest.fixture
+def tieStrengthHandler():
+    return TieStrengthHandler.TieStrengthHandler(60*12, 0.3, 17*24*60)
+
+
+#@return tuple (nodeMap, adjacency, neighborMap) of the graph, built from its node and edge lists
+def lookupsFromLists(graph):
+    nodeMap = {node.getID(): node for node in graph.nodes}
+    adjacency = {frozenset(edge.getTupleFormatIDonly()): edge for edge in graph.edges}
+    neighborMap = {node.getID(): {} for node in graph.nodes}
+    for edge in graph.edges:
+        sourceID, targetID = edge.getTupleFormatIDonly()
+        neighborMap[sourceID][targetID] = edge
+        neighborMap[targetID][sourceID] = edge
+    return nodeMap, adjacency, neighborMap
+
+
+def assertLookupsFollowTheLists(graph):
+    assert (graph.nodeMap, graph.adjacency, graph.neighborMap) == lookupsFromLists(graph)
+
+
+#graph with nodes 0 to 3 and edges 0-1, 1-2 and 2-3
+@pytest.fixture
+def graph(tieStrengthHandler):
+    resources = [Resource.Resource(i, "R" + str(i)) for i in range(4)]
+    graph = Graph.Graph([], [], {})
+    graph.addResourcesAsNodes(resources)
+    for resource1, resource2 in zip(resources, resources[1:]):
+        graph.createNewEdge(resource1, resource2, tieStrengthHandler)
+    return graph
+
+
+@pytest.mark.parametrize("searchedFirst", [False, True])
+def test_lookupsFollowTheChanges(graph, tieStrengthHandler, searchedFirst):
+    if searchedFirst:
+        assertLookupsFollowTheLists(graph)
+    resource4 = Resource.Resource(4, "R4")
+    graph.createNewNode(resource4)
+    edge = graph.createNewEdge(resource4, graph.nodes[0].getResource(), tieStrengthHandler)
+    graph.removeEdge(graph.edges[1])
+    assertLookupsFollowTheLists(graph)
+
+    assert graph.findEdge(graph.nodes[0].getResource(), resource4) is edge
+    assert graph.findEdge(graph.nodes[1].getResource(), graph.nodes[2].getResource()) is None
+    assert sorted(graph.getNeighborIDs(0)) == [1, 4]
+    assert len(graph.edgeWeights) == len(graph.edges) == 3
+
+
+def test_addNodeSkipsKnownResources(graph):
+    graph.addResourcesAsNodes([graph.nodes[0].getResource()])
+    assert graph.getListOfNodeIDs() == [0, 1, 2, 3]
+
+
+def test_lookupsMoveToTheCopy(graph, tieStrengthHandler):
+    assertLookupsFollowTheLists(graph)
+    copyGraph = graph.deepCopy()
+    copyGraph.removeEdge(copyGraph.edges[0])
+    copyGraph.createNewNode(Resource.Resource(4, "R4"))
+
+    #the original is searched again after the copy has changed
+    assertLookupsFollowTheLists(graph)
+    assertLookupsFollowTheLists(copyGraph)
+    assert graph.findNode(Resource.Resource(4, "R4")) is None
+    assert len(graph.edges) == 3 and len(copyGraph.edges) == 2
@@ -0,0 +1,51 @@
+import collections
+import csv
+import io
+
+import pytest
+
+import MembershipChangeMonitor
+import TeamMatcher
+from conftest import BEGIN_TIMESTAMP, END_TIMESTAMP, TIME_SLICE_UNIT, createGraphEvolutionParser
+
+
+#@return Counter of the CSV rows written by the type of change for these changes
+def csvRows(typeOfChange, changes):
+    output = io.StringIO()
+    typeOfChange.printToCSV(changes, csv.writer(output, delimiter=";"))
+    return collections.Counter(output.getvalue().splitlines())
+
+
+#@return dict with the name of each type of change as key and the Counter of the CSV rows of its changes as value
+def detectInBatch(dataparser, detectPerType = False):
+    graphEvolutionParser = createGraphEvolutionParser(dataparser)
+    temporalGraph = graphEvolutionParser.createTemporalGraph(BEGIN_TIMESTAMP, END_TIMESTAMP, TIME_SLICE_UNIT)
+    graphEvolutionParser.detectTemporalTeams(temporalGraph)
+    membershipChangeMonitor = MembershipChangeMonitor.MembershipChangeMonitor(temporalGraph)
+    if detectPerType:
+        membershipChangeMonitor.detectMembershipChangesPerType()
+    else:
+        membershipChangeMonitor.detectMembershipChanges()
+    return {type(typeOfChange).__name__: csvRows(typeOfChange, changes) for typeOfChange, changes in membershipChangeMonitor.membershipChanges.items()}
+
+
+@pytest.fixture(scope="module")
+def batchChanges(dataparser):
+    return detectInBatch(dataparser)
+
+
+def test_singlePassEqualsPerType(dataparser, batchChanges):
+    assert detectInBatch(dataparser, detectPerType = True) == batchChanges
+
+
+def test_streamEqualsBatch(dataparser, batchChanges):
+    graphEvolutionParser = createGraphEvolutionParser(dataparser)
+    snapshots = graphEvolutionParser.createTemporalGraph(BEGIN_TIMESTAMP, END_TIMESTAMP, TIME_SLICE_UNIT, lazy = True)
+    snapshots = graphEvolutionParser.detectTeamsInStream(snapshots)
+    matchedSnapshots = TeamMatcher.matchTeamsInStream(snapshots)
+
+    streamChanges = {name: collections.Counter() for name in batchChanges}
+    for typeOfChange, changes in MembershipChangeMonitor.MembershipChangeMonitor().detectMembershipChangesInStream(matchedSnapshots):
+        streamChanges[type(typeOfChange).__name__] += csvRows(typeOfChange, changes)
+    assert streamChanges == batchChanges
+    assert sum(batchChanges.values(), collections.Counter())
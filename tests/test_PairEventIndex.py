@@ -0,0 +1,41 @@
+import pytest
+
+from conftest import BEGIN_TIMESTAMP, END_TIMESTAMP, TIME_SLICE_UNIT, createGraphEvolutionParser, snapshotContents
+
+
+@pytest.fixture(scope="module")
+def graphEvolutionParser(dataparser):
+    return createGraphEvolutionParser(dataparser)
+
+
+@pytest.fixture(scope="module")
+def snapshots(graphEvolutionParser):
+    return graphEvolutionParser.createTemporalGraph(BEGIN_TIMESTAMP, END_TIMESTAMP, TIME_SLICE_UNIT).getListOfGraphs()
+
+
+def test_weightAtMatchesTheSnapshots(graphEvolutionParser, snapshots):
+    pairEventIndex = graphEvolutionParser.getPairEventIndex()
+    for snapshot in snapshots:
+        for edge in snapshot.getEdges():
+            resource1, resource2 = [node.getResource() for node in edge.getTupleFormat()]
+            weight = pairEventIndex.weightAt(resource1, resource2, snapshot.getTimestamp())
+            assert weight == pytest.approx(snapshot.findEdgeWeight(edge), rel = 1e-12)
+            assert pairEventIndex.weightAt(resource2, resource1, snapshot.getTimestamp()) == weight
+
+
+def test_getEdgesAtMatchesTheSnapshots(graphEvolutionParser, snapshots):
+    pairEventIndex = graphEvolutionParser.getPairEventIndex()
+    for snapshot in snapshots:
+        creationEvents, weights = pairEventIndex.getEdgesAt(snapshot.getTimestamp())
+        expectedWeights = [snapshot.findEdgeWeight(edge) for edge in snapshot.getEdges()]
+        assert len(creationEvents) == len(expectedWeights)
+        assert weights.tolist() == pytest.approx(expectedWeights, rel = 1e-12)
+
+
+def test_graphAtMatchesTheSnapshots(graphEvolutionParser, snapshots):
+    for snapshot in snapshots[::10]:
+        nodeIDs, edges = snapshotContents(graphEvolutionParser.graphAt(snapshot.getTimestamp()))
+        expectedNodeIDs, expectedEdges = snapshotContents(snapshot)
+        assert nodeIDs == expectedNodeIDs
+        assert [(source, target) for source, target, weight in edges] == [(source, target) for source, target, weight in expectedEdges]
+        assert [weight for source, target, weight in edges] == pytest.approx([weight for source, target, weight in expectedEdges], rel = 1e-12)
@@ -0,0 +1,34 @@
+import os
+
+import numpy as np
+import pytest
+
+import ParseCache
+from conftest import dataFile, parseArtificialData, assertSameEvents
+
+
+def test_cacheRoundTrip(dataparser, tmp_path):
+    cacheFile = ParseCache.getCacheFileName(str(tmp_path), [dataFile("AI_resources.csv"), dataFile("AI_objects.csv"), dataFile("AI_collab_sessions.csv"), None])
+    ParseCache.saveParsedData(cacheFile, dataparser.getCollabEventStore(), dataparser.getWorkEventsList())
+
+    resources, objects, eventStore, workEvents = ParseCache.loadParsedData(cacheFile)
+    assertSameEvents(eventStore, dataparser.getCollabEventStore())
+    assert [resource.getID() for resource in resources] == [resource.getID() for resource in dataparser.getResourceList()]
+    assert [obj.getID() for obj in objects] == [obj.getID() for obj in dataparser.getObjectList()]
+    assert workEvents == [] == dataparser.getWorkEventsList()
+
+
+def test_parseAllDataLoadsFromTheCache(dataparser, tmp_path):
+    parseArtificialData(cacheDirectory = str(tmp_path))
+    assert len(os.listdir(tmp_path)) == 1
+    cachedData = parseArtificialData(cacheDirectory = str(tmp_path))
+    assertSameEvents(cachedData.getCollabEventStore(), dataparser.getCollabEventStore())
+
+
+def test_failedWriteLeavesNoTemporaryFile(dataparser, tmp_path, monkeypatch):
+    def failingSavez(*args, **kwargs):
+        raise OSError("disk full")
+    monkeypatch.setattr(np, "savez", failingSavez)
+    with pytest.raises(OSError):
+        ParseCache.saveParsedData(str(tmp_path / "parse.npz"), dataparser.getCollabEventStore(), dataparser.getWorkEventsList())
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,56 @@
+import pytest
+
+from conftest import BEGIN_TIMESTAMP, END_TIMESTAMP, TIME_SLICE_UNIT, createGraphEvolutionParser, snapshotContents
+
+
+@pytest.fixture(scope="module")
+def eagerSnapshots(dataparser):
+    temporalGraph = createGraphEvolutionParser(dataparser).createTemporalGraph(BEGIN_TIMESTAMP, END_TIMESTAMP, TIME_SLICE_UNIT)
+    return temporalGraph.getListOfGraphs()
+
+
+#@return list of StoredSnapshot objects of the same period, with few snapshots between the keyframes
+def createStoredSnapshots(dataparser, keyframeInterval = 5):
+    temporalGraph = createGraphEvolutionParser(dataparser).createTemporalGraph(BEGIN_TIMESTAMP, END_TIMESTAMP, TIME_SLICE_UNIT, deltaEncoded = True, keyframeInterval = keyframeInterval)
+    return temporalGraph.getListOfGraphs()
+
+
+def test_rebuiltSnapshotsEqualEagerGraphs(dataparser, eagerSnapshots):
+    storedSnapshots = createStoredSnapshots(dataparser)
+    assert len(storedSnapshots) == len(eagerSnapshots)
+    for storedSnapshot, eagerSnapshot in zip(storedSnapshots, eagerSnapshots):
+        assert storedSnapshot.getTimestamp() == eagerSnapshot.getTimestamp()
+        assert snapshotContents(storedSnapshot) == snapshotContents(eagerSnapshot)
+
+
+def test_accessOrderDoesNotMatter(dataparser, eagerSnapshots):
+    storedSnapshots = createStoredSnapshots(dataparser)
+    #backwards, and alternating between a snapshot and one far before it
+    indices = list(reversed(range(len(storedSnapshots))))
+    indices += [i for index in range(0, len(storedSnapshots), 3) for i in (index, index // 2)]
+    for index in indices:
+        assert snapshotContents(storedSnapshots[index]) == snapshotContents(eagerSnapshots[index])
+
+
+def test_storedSnapshotIsAReadOnlyGraphView(dataparser, eagerSnapshots):
+    storedSnapshots = createStoredSnapshots(dataparser)
+    storedSnapshot, eagerSnapshot = storedSnapshots[-1], eagerSnapshots[-1]
+    for nodeID in eagerSnapshot.getListOfNodeIDs():
+        assert sorted(storedSnapshot.getNeighborIDs(nodeID)) == sorted(eagerSnapshot.getNeighborIDs(nodeID))
+    assert storedSnapshot.getMaxEdgeWeight() == eagerSnapshot.getMaxEdgeWeight()
+    assert sorted(storedSnapshot.getNetworkxGraph().edges) == sorted(eagerSnapshot.getNetworkxGraph().edges)
+
+    #the teams belong to the view, not to the rebuilt graph it shares with the other views
+    storedSnapshot.setTeams({nodeID: 0 for nodeID in storedSnapshot.getListOfNodeIDs()})
+    assert storedSnapshots[-2].getTeams() is None
+    assert not hasattr(storedSnapshot, "decayEdges")
+
+
+def test_changesAreThoseOfTheDelta(dataparser):
+    storedSnapshots = createStoredSnapshots(dataparser)
+    for previousSnapshot, snapshot in zip(storedSnapshots, storedSnapshots[1:]):
+        addedNodes, removedEdges, addedEdges = snapshot.getChangesSince(previousSnapshot)
+        previousEdges = set(previousSnapshot.edges)
+        assert set(snapshot.edges) == (previousEdges - set(removedEdges)) | set(addedEdges)
+        assert snapshot.nodes == previousSnapshot.nodes + addedNodes
+    assert storedSnapshots[2].getChangesSince(storedSnapshots[0]) is None
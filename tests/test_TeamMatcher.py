@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+import TeamMatcher
+
+#small team sets with the matches of the greedy matcher before the priority queue (including its tie breaking)
+GREEDY_CASES = [
+    ([{1, 2, 3}, {4, 5}, {6}], [{1, 2}, {3, 4, 5}, {6, 7}],
+     [({1, 2, 3}, {1, 2}), ({4, 5}, {3, 4, 5}), ({6}, {6, 7})]),
+    ([{1, 2, 3, 4}, {5, 6}], [{1, 2}, {3, 4}, {5}, {6, 7}],
+     [({1, 2, 3, 4}, {1, 2}), ({5, 6}, {5}), (None, {3, 4}), (None, {6, 7})]),
+    ([{1, 2}, {3, 4}, {5, 6}], [{1, 2, 3, 4, 5, 6}],
+     [({1, 2}, {1, 2, 3, 4, 5, 6}), ({3, 4}, None), ({5, 6}, None)]),
+    ([{1, 2, 3}, {4, 5, 6}, {7}], [{8, 9}, {1, 4}, {2, 5, 7}],
+     [({1, 2, 3}, {1, 4}), ({4, 5, 6}, {2, 5, 7}), (None, {8, 9}), ({7}, None)]),
+    ([{1, 2, 3}, {4, 5, 6}], [{1, 2, 4, 5}, {3, 6}],
+     [({1, 2, 3}, {1, 2, 4, 5}), ({4, 5, 6}, {3, 6})]),
+]
+
+
+@pytest.mark.parametrize("previousTeams, currentTeams, expectedMatches", GREEDY_CASES)
+def test_greedyMatchesEqualBaseline(previousTeams, currentTeams, expectedMatches):
+    assert TeamMatcher.findBestTeamMatches(previousTeams, currentTeams) == expectedMatches
+
+
+def test_greedyIndicesGiveTheSameMatches():
+    for previousTeams, currentTeams, expectedMatches in GREEDY_CASES:
+        matchIndices = TeamMatcher.findBestTeamMatchIndices(previousTeams, currentTeams)
+        assert TeamMatcher.teamMatchesFromIndices(matchIndices, previousTeams, currentTeams) == expectedMatches
+
+
+def test_transFormIntoSet():
+    assert sorted(map(sorted, TeamMatcher.transFormIntoSet({1: 0, 2: 0, 3: 1, 4: 2, 5: 1}))) == [[1, 2], [3, 5], [4]]
+
+
+def test_optimalMatchesMaximizeTheTotalOverlap():
+    previousTeams = [{1, 2, 3}, {4, 5}]
+    currentTeams = [{1, 2, 4, 5}, {3}, {6}]
+    assert TeamMatcher.findOptimalTeamMatchIndices(previousTeams, currentTeams, TeamMatcher.OVERLAP) == [(0, 1), (1, 0), (None, 2)]
+    assert TeamMatcher.findOptimalTeamMatches(previousTeams, currentTeams, TeamMatcher.OVERLAP) == [({1, 2, 3}, {3}), ({4, 5}, {1, 2, 4, 5}), (None, {6})]
+
+
+def test_jaccardPrefersTeamsOfTheSameSize():
+    previousTeams = [{1, 2}]
+    currentTeams = [{1, 2, 3, 4, 5, 6}, {1}]
+    assert TeamMatcher.findOptimalTeamMatchIndices(previousTeams, currentTeams, TeamMatcher.OVERLAP) == [(0, 0), (None, 1)]
+    assert TeamMatcher.findOptimalTeamMatchIndices(previousTeams, currentTeams, TeamMatcher.JACCARD) == [(0, 1), (None, 0)]
+
+
+#@return total score of the matches
+def totalScore(matchIndices, previousTeams, currentTeams, scoring):
+    total = 0
+    for p, c in matchIndices:
+        if p is not None and c is not None:
+            overlap = len(previousTeams[p] & currentTeams[c])
+            total += overlap if scoring == TeamMatcher.OVERLAP else overlap / len(previousTeams[p] | currentTeams[c])
+    return total
+
+
+@pytest.mark.parametrize("scoring", [TeamMatcher.OVERLAP, TeamMatcher.JACCARD])
+def test_blocksGiveTheSameTotalScoreAsTheFullMatrix(scoring, monkeypatch):
+    generator = random.Random(7)
+    for trial in range(50):
+        numberOfPreviousTeams, numberOfCurrentTeams = generator.randint(1, 60), generator.randint(1, 60)
+        previousTeams = [set() for team in range(numberOfPreviousTeams)]
+        currentTeams = [set() for team in range(numberOfCurrentTeams)]
+        for nodeID in range(generator.randint(1, 200)):
+            previousTeams[generator.randrange(numberOfPreviousTeams)].add(nodeID)
+            currentTeams[generator.randrange(numberOfCurrentTeams)].add(nodeID)
+        previousTeams = [team for team in previousTeams if team]
+        currentTeams = [team for team in currentTeams if team]
+
+        monkeypatch.setattr(TeamMatcher, "DENSE_MATCHING_SIZE", 0)
+        blockMatches = TeamMatcher.findOptimalTeamMatchIndices(previousTeams, currentTeams, scoring)
+        monkeypatch.setattr(TeamMatcher, "DENSE_MATCHING_SIZE", 10**9)
+        denseMatches = TeamMatcher.findOptimalTeamMatchIndices(previousTeams, currentTeams, scoring)
+
+        assert totalScore(blockMatches, previousTeams, currentTeams, scoring) == pytest.approx(totalScore(denseMatches, previousTeams, currentTeams, scoring))
+        #every team appears exactly once
+        assert sorted(p for p, c in blockMatches if p is not None) == list(range(len(previousTeams)))
+        assert sorted(c for p, c in blockMatches if c is not None) == list(range(len(currentTeams)))